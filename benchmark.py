@@ -0,0 +1,164 @@
+"""Headless benchmarks for the history storage and the Histórico view.
+
+Usage:
+    python benchmark.py [--sizes 1000 10000 100000] [--backend json sqlite]
+                        [--output results.json]
+
+Each run builds a synthetic history of the given size in a temporary
+folder, so the real common/data is never touched. Results are printed
+(or written) as JSON: one object per (backend, size) with timings in ms.
+Saves and loads go through the public history functions (save_record,
+save_records, load_history); save_record_compacting runs enough saves to
+trigger the periodic snapshot rewrite, which its max_ms shows.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import datetime as dt
+import statistics
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import history
+
+STATUSES = ['Subiu', 'Desceu', 'Pronto']
+
+
+def synthetic_history(size: int, days: int = 365, seed: int = 1) -> list:
+    """size entries spread over the last `days` days."""
+    rnd = random.Random(seed)
+    now = dt.datetime.now()
+    entries = []
+    for i in range(size):
+        t = now - dt.timedelta(seconds=rnd.randrange(days * 86400))
+        entry = {'objeto': f'OBJ-{i:07d}', 'subiu': None, 'desceu': None, 'pronto': None, 'status': None}
+        for status in STATUSES[:rnd.randint(1, 3)]:
+            entry[status.lower()] = t.strftime('%Y-%m-%d %H:%M:%S')
+            entry['status'] = status
+            t += dt.timedelta(minutes=rnd.randint(1, 600))
+        entries.append(entry)
+    return entries
+
+
+def write_history(data_dir: str, backend: str, entries: list):
+    with open(os.path.join(data_dir, os.path.basename(history.HIST_FILE)), 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    if backend == 'sqlite':
+        history.migrate_to_sqlite(data_dir)
+    else:
+        # Move closed records to the monthly archive before anything is timed
+        history.HistoryStore(data_dir, backend).load()
+
+
+def timed(fn, repeat: int = 1) -> dict:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'runs': repeat,
+    }
+
+
+def bench_storage(backend: str, size: int, repeat: int) -> dict:
+    result = {'backend': backend, 'size': size}
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_history(data_dir, backend, synthetic_history(size))
+        result['file_bytes'] = sum(
+            os.path.getsize(os.path.join(data_dir, name)) for name in os.listdir(data_dir)
+        )
+
+        def fresh_load(*date_range):
+            # A new store each run, so the files are read again
+            history._store = history.HistoryStore(data_dir, backend)
+            history.load_history(*date_range)
+
+        result['load_history'] = timed(fresh_load, repeat=max(1, repeat // 5))
+
+        store = history.HistoryStore(data_dir, backend)
+        store.load()
+        history._store = store
+        counter = iter(range(10 ** 9))
+        result['save_record'] = timed(
+            lambda: history.save_record(f'NEW-{next(counter)}', 'Subiu'), repeat=repeat * 10)
+        result['save_records_100'] = timed(
+            lambda: history.save_records([(f'NEW-{next(counter)}', 'Desceu') for _ in range(100)]),
+            repeat=repeat)
+        # Enough single saves to cross COMPACT_EVERY: max_ms is the save that
+        # rewrote the snapshot
+        result['save_record_compacting'] = timed(
+            lambda: history.save_record(f'NEW-{next(counter)}', 'Subiu'),
+            repeat=history.COMPACT_EVERY + 1)
+        result['compact'] = timed(store.compact, repeat=max(1, repeat // 5))
+
+        today = dt.date.today()
+        week = ((today - dt.timedelta(days=7)).isoformat(), today.isoformat())
+        year = ((today - dt.timedelta(days=365)).isoformat(), today.isoformat())
+        result['load_history_week'] = timed(lambda: history.load_history(*week), repeat=repeat)
+        result['load_history_year'] = timed(lambda: history.load_history(*year), repeat=repeat)
+        history._store = None
+
+        result['history_dialog'] = bench_history_dialog(store, repeat)
+    return result
+
+
+def bench_history_dialog(store, repeat: int) -> dict:
+    """Open the Histórico dialog on a year-wide range, offscreen."""
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QDate
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    history._store = store
+    from dialogs import HistoryDialog
+
+    def open_dialog():
+        dlg = HistoryDialog()
+        dlg.date_start.setDate(QDate.currentDate().addDays(-365))
+        dlg.load()
+        app.processEvents()
+        dlg.deleteLater()
+
+    try:
+        open_dialog()  # warm-up: first dialog pays for font and style setup
+        return timed(open_dialog, repeat=max(1, repeat // 5))
+    finally:
+        app.processEvents()
+        history._store = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--backend', nargs='+', default=['json'], choices=sorted(history._BACKENDS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    results = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'timestamp': dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'results': [
+            bench_storage(backend, size, args.repeat)
+            for backend in args.backend
+            for size in args.sizes
+        ],
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
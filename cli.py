@@ -0,0 +1,123 @@
+"""Command line mode: records and queries without the tray.
+
+Usage:
+    python main.py add "Contrato 123" "Contrato 124 | pronto" [--status Subiu]
+    python main.py add --from-file lista.txt        (- reads stdin)
+    python main.py query [--from 2024-01-01] [--to 2024-12-31] [--json]
+    python main.py status "Contrato 123" [--timeline]
+    python main.py compact
+    python main.py export historico.csv / import lista.xlsx   (see transfer.py)
+
+Only history.py and its Qt-free helpers are imported, never PySide6 or
+keyboard, so these commands start in milliseconds. add appends to the
+journal under the shared file lock, so a running tray picks it up, and
+status looks the objeto up by key; neither loads the whole history.
+"""
+import sys
+import json
+import argparse
+
+import history
+from stats import STATUSES
+
+COMMANDS = ('add', 'query', 'status', 'compact', 'export', 'import')
+_FIELDS = ('objeto', 'status', 'subiu', 'desceu', 'pronto')
+
+
+def _read_lines(path: str) -> list:
+    if path == '-':
+        return sys.stdin.read().splitlines()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return f.read().splitlines()
+
+
+def _print_entry(entry, as_json: bool):
+    if as_json:
+        print(json.dumps(entry.to_dict(), ensure_ascii=False))
+    else:
+        print('\t'.join(entry.get(field) or '' for field in _FIELDS))
+
+
+def cmd_add(args) -> int:
+    lines = list(args.objetos)
+    if args.from_file:
+        lines += _read_lines(args.from_file)
+    batch = []
+    for line in lines:
+        objeto, status = history.parse_line(line, args.status)
+        if objeto:
+            batch.append((objeto.upper(), status))
+    if not batch:
+        print("Nenhum objeto informado.", file=sys.stderr)
+        return 1
+    # Appended to the journal in one write, without loading the history
+    count = history.get_store().log_many(batch)
+    print(f"{count} registros salvos")
+    return 0
+
+
+def cmd_query(args) -> int:
+    for chunk in history.get_store().iter_range(args.start_date, args.end_date):
+        for entry in chunk:
+            _print_entry(entry, args.json)
+    return 0
+
+
+def cmd_status(args) -> int:
+    store = history.get_store()
+    # Looked up by key (snapshot, journal, newest partition) without loading everything
+    entry = store.find(args.objeto)
+    if entry is None:
+        print(f"Objeto não encontrado: {args.objeto}", file=sys.stderr)
+        return 1
+    _print_entry(entry, args.json)
+    if args.timeline:
+        for event in store.timeline(args.objeto):
+            print(json.dumps(event, ensure_ascii=False) if args.json else f"{event['ts']}\t{event['status']}")
+    return 0
+
+
+def cmd_compact(args) -> int:
+    history.compact()
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in ('export', 'import'):
+        import transfer
+        return transfer.main(argv)
+
+    parser = argparse.ArgumentParser(prog='main.py', description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add', help='salva objetos ("nome" ou "nome | status")')
+    add.add_argument('objetos', nargs='*')
+    add.add_argument('--from-file', help='arquivo com um objeto por linha (- para stdin)')
+    add.add_argument('--status', default='Subiu', choices=list(STATUSES),
+                     help='status dos objetos sem "| status"')
+    add.set_defaults(func=cmd_add)
+    query = sub.add_parser('query', help='lista os registros, opcionalmente de um período')
+    query.add_argument('--from', dest='start_date', help='AAAA-MM-DD')
+    query.add_argument('--to', dest='end_date', help='AAAA-MM-DD')
+    query.add_argument('--json', action='store_true', help='um objeto JSON por linha')
+    query.set_defaults(func=cmd_query)
+    status = sub.add_parser('status', help='status atual de um objeto')
+    status.add_argument('objeto')
+    status.add_argument('--timeline', action='store_true', help='mostra todas as mudanças de status')
+    status.add_argument('--json', action='store_true', help='saída em JSON')
+    status.set_defaults(func=cmd_status)
+    compact = sub.add_parser('compact', help='consolida o diário e arquiva os registros prontos')
+    compact.set_defaults(func=cmd_compact)
+    sub.add_parser('export', help='grava o histórico em .csv ou .xlsx (ver transfer.py)')
+    sub.add_parser('import', help='salva os registros de um .csv ou .xlsx (ver transfer.py)')
+    args = parser.parse_args(argv)
+
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import os
+import json
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'data', 'config.json')
+
+DEFAULTS = {
+    # 'json' (snapshot + journal) or 'sqlite'
+    'storage_backend': 'json',
+    # Timing of the hot paths, shown by the tray "Diagnóstico" entry (also: --diag)
+    'diagnostics': False,
+    # Journal appends are fsynced at most once per this many seconds (0: every save)
+    'fsync_interval': 0.1,
+    # Local endpoint for scripts and scanners (see ipc.py), e.g. 47615; 0 disables it
+    'ipc_port': 0,
+    # Shared secret for the endpoint (X-OPECBrain-Token header); needed for
+    # requests that are not application/json
+    'ipc_token': '',
+    # Global hotkeys (keyboard module syntax); an empty value disables one
+    'hotkeys': {
+        'new_record': 'ctrl+0',
+        'open_history': '',
+    },
+}
+
+_config = None
+
+
+def load_config() -> dict:
+    """Defaults overridden by common/data/config.json, read once per process."""
+    global _config
+    if _config is None:
+        _config = dict(DEFAULTS)
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                _config.update(json.load(f) or {})
+        except Exception:
+            pass
+    return _config
+
+
+def get(key: str):
+    return load_config().get(key, DEFAULTS.get(key))
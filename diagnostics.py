@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import time
+import functools
+from collections import deque
+
+import config
+
+EXPORT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'data', 'diagnostics.json')
+
+# Decided once at startup: with diagnostics off, timed() returns the function
+# itself, so instrumented code runs exactly as before.
+enabled = bool(config.get('diagnostics')) or '--diag' in sys.argv
+
+# Percentiles are computed over the most recent samples of each measurement
+WINDOW = 1000
+
+_samples = {}  # name -> deque of durations in ms
+
+
+def record(name: str, ms: float):
+    if not enabled:
+        return
+    samples = _samples.get(name)
+    if samples is None:
+        samples = _samples.setdefault(name, deque(maxlen=WINDOW))
+    samples.append(ms)
+
+
+def timed(name: str):
+    """Decorator recording how long each call takes under name."""
+    def decorator(fn):
+        if not enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - t) * 1000)
+        return wrapper
+    return decorator
+
+
+def _percentile(ordered: list, p: float) -> float:
+    k = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return round(ordered[k], 3)
+
+
+def summary() -> dict:
+    """{name: {count, p50, p95, p99, max}} over the rolling window, in ms."""
+    result = {}
+    for name, samples in list(_samples.items()):
+        ordered = sorted(samples)
+        if not ordered:
+            continue
+        result[name] = {
+            'count': len(ordered),
+            'p50': _percentile(ordered, 50),
+            'p95': _percentile(ordered, 95),
+            'p99': _percentile(ordered, 99),
+            'max': round(ordered[-1], 3),
+        }
+    return result
+
+
+def export(path: str = EXPORT_FILE) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary(), f, ensure_ascii=False, indent=2)
+    return path
+
+
+def format_summary() -> str:
+    lines = []
+    for name, s in sorted(summary().items()):
+        lines.append(f"{name}: n={s['count']}  p50={s['p50']} ms  p95={s['p95']} ms  p99={s['p99']} ms")
+    return '\n'.join(lines) or 'Nenhuma medição ainda.'
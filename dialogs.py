@@ -0,0 +1,435 @@
+import threading
+from typing import Optional
+
+from PySide6.QtWidgets import (
+    QApplication, QDialog, QVBoxLayout, QLabel, QLineEdit, QComboBox,
+    QHBoxLayout, QTableView, QWidget, QHeaderView, QPushButton, QDateEdit, QCompleter,
+    QMessageBox, QFileDialog
+)
+from PySide6.QtGui import QKeySequence
+from PySide6.QtCore import Qt, QDate, QStringListModel, QObject, Signal
+
+import diagnostics
+import resources
+from history import entry_in_date_range, get_store, parse_line, save_record, save_records
+from history_model import HistoryTableModel, HistoryFilterProxy, StoreLoader, store_notifier
+from save_worker import SaveWorker
+from search_index import ObjetoIndex
+from stats import format_counts
+
+
+class AddBarDialog(QDialog):
+    HELP_TEXT = "Enter para salvar · Esc para fechar"
+
+    def __init__(self, parent: Optional[QWidget] = None, save_worker: Optional[SaveWorker] = None):
+        super().__init__(parent)
+        # Saves go through the writer thread when one is given
+        self.save_worker = save_worker
+        self.setWindowTitle("Novo registro")
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setFixedWidth(620)
+        # Styled by the app-wide sheet (see resources.py); also sets the window icon
+        self.setObjectName("addBar")
+        resources.install()
+
+        # Main container with rounded corners
+        container = QWidget(self)
+        container.setObjectName("container")
+        container_lay = QVBoxLayout(self)
+        container_lay.setContentsMargins(0, 0, 0, 0)
+        container_lay.addWidget(container)
+
+        lay = QVBoxLayout(container)
+        lay.setContentsMargins(16, 16, 16, 16)
+        lay.setSpacing(12)
+
+        # Title row: input + status on same line
+        input_row = QHBoxLayout()
+        input_row.setSpacing(10)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Título")
+        self.input.setMinimumHeight(36)
+        # Force uppercase
+        self.input.textChanged.connect(self._force_upper)
+        # Add key-return icon inside the input on the right
+        key_icon = resources.icon('key-return.png')
+        if not key_icon.isNull():
+            self.enter_action = self.input.addAction(key_icon, QLineEdit.TrailingPosition)
+        input_row.addWidget(self.input, 3)
+
+        self.status = QComboBox()
+        self.status.addItems(["Subiu", "Desceu", "Pronto"])
+        self.status.setMinimumHeight(36)
+        self.status.setMinimumWidth(130)
+        input_row.addWidget(self.status, 1)
+        lay.addLayout(input_row)
+
+        self.help_lbl = QLabel(self.HELP_TEXT)
+        self.help_lbl.setAlignment(Qt.AlignCenter)
+        self.help_lbl.setObjectName("helpLabel")
+        lay.addWidget(self.help_lbl)
+
+        if self.save_worker is not None:
+            self.save_worker.saved.connect(self._on_saved)
+            self.save_worker.failed.connect(self._on_save_failed)
+
+        # Type-ahead from the objects already in the history; the list is
+        # ranked by the store (open and recent first), so Qt must not filter it
+        self._completions = QStringListModel(self)
+        self.completer = QCompleter(self._completions, self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setWidget(self.input)
+        self.completer.activated.connect(self.input.setText)
+        self.completer.popup().setObjectName("addBarCompletions")
+        self.input.textEdited.connect(self._update_completions)
+
+        self.input.returnPressed.connect(self._on_enter)
+        self.input.setFocus()
+
+        # Install event filter to catch Esc key
+        self.input.installEventFilter(self)
+        self.status.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        from PySide6.QtCore import QEvent
+        if event.type() == QEvent.KeyPress and event.key() == Qt.Key_Escape:
+            self.close()
+            return True
+        # A multi-line paste (e.g. a column copied from a spreadsheet) is saved as a batch
+        if obj is self.input and event.type() == QEvent.KeyPress and event.matches(QKeySequence.Paste):
+            lines = [l for l in QApplication.clipboard().text().splitlines() if l.strip()]
+            if len(lines) > 1:
+                self._save_lines(lines)
+                return True
+        return super().eventFilter(obj, event)
+
+    def _force_upper(self, text):
+        if text != text.upper():
+            pos = self.input.cursorPosition()
+            self.input.blockSignals(True)
+            self.input.setText(text.upper())
+            self.input.setCursorPosition(pos)
+            self.input.blockSignals(False)
+
+    def _update_completions(self, _typed):
+        # Read the field itself: _force_upper has already rewritten it
+        text = self.input.text()
+        names = []
+        if text.strip() and '|' not in text and '\t' not in text:
+            names = get_store().complete(text)
+        if not names or names == [text.strip()]:
+            self.completer.popup().hide()
+            return
+        self._completions.setStringList(names)
+        self.completer.complete()
+
+    def _on_enter(self):
+        popup = self.completer.popup()
+        if popup.isVisible():
+            # Enter on a highlighted completion only picks it; the next Enter saves
+            if popup.currentIndex().isValid():
+                return
+            popup.hide()
+        text = self.input.text().strip()
+        if not text:
+            return
+        text, status = parse_line(text, self.status.currentText())
+        if self.save_worker is not None:
+            self.save_worker.submit(text, status)
+        else:
+            save_record(text, status)
+        # keep dialog open for continuous entry: clear field
+        self.input.clear()
+        self.input.setFocus()
+
+    def _save_lines(self, lines):
+        default_status = self.status.currentText()
+        batch = []
+        for line in lines:
+            objeto, status = parse_line(line, default_status)
+            if objeto:
+                batch.append((objeto.upper(), status))
+        if not batch:
+            return
+        if self.save_worker is not None:
+            self.help_lbl.setText(f"Salvando {len(batch)} registros…")
+            self.save_worker.submit_many(batch)
+        else:
+            save_records(batch)
+        self.input.clear()
+        self.input.setFocus()
+
+    def _on_saved(self, entries):
+        self.help_lbl.setText(self.HELP_TEXT)
+
+    def _on_save_failed(self, message):
+        self.help_lbl.setText(f"Erro ao salvar: {message}")
+
+    @diagnostics.timed('AddBarDialog.show_centered')
+    def show_centered(self):
+        # The dialog is reused: start each opening from a clean field
+        self.input.clear()
+        self.completer.popup().hide()
+        self.help_lbl.setText(self.HELP_TEXT)
+        self.adjustSize()
+        screen = QApplication.primaryScreen().availableGeometry()
+        w = self.width()
+        h = self.height()
+        x = (screen.width() - w) // 2
+        y = (screen.height() - h) // 2
+        self.move(x, y)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.input.setFocus()
+
+
+class HistoryDialog(QDialog):
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setWindowTitle("Histórico")
+        self.setWindowFlag(Qt.WindowStaysOnTopHint, True)
+        self.resize(1100, 580)
+        # Grayscale dark theme from the app-wide sheet (see resources.py)
+        self.setObjectName("historyDialog")
+        resources.install()
+
+        lay = QVBoxLayout()
+        self.setLayout(lay)
+
+        # Date filter row
+        filter_row = QHBoxLayout()
+        filter_row.setSpacing(10)
+        
+        filter_row.addWidget(QLabel("Data Inicial:"))
+        self.date_start = QDateEdit()
+        self.date_start.setCalendarPopup(True)
+        self.date_start.setDate(QDate.currentDate())
+        self.date_start.setDisplayFormat("dd/MM/yyyy")
+        self.date_start.setMinimumHeight(32)
+        filter_row.addWidget(self.date_start)
+        
+        filter_row.addWidget(QLabel("Data Final:"))
+        self.date_end = QDateEdit()
+        self.date_end.setCalendarPopup(True)
+        self.date_end.setDate(QDate.currentDate())
+        self.date_end.setDisplayFormat("dd/MM/yyyy")
+        self.date_end.setMinimumHeight(32)
+        filter_row.addWidget(self.date_end)
+        
+        self.btn_filter = QPushButton("Filtrar")
+        self.btn_filter.setMinimumHeight(32)
+        self.btn_filter.setMinimumWidth(80)
+        self.btn_filter.clicked.connect(self._on_filter)
+        filter_row.addWidget(self.btn_filter)
+
+        # Exports the records of the date range above
+        self.btn_export = QPushButton("Exportar")
+        self.btn_export.setMinimumHeight(32)
+        self.btn_export.clicked.connect(self._on_export)
+        filter_row.addWidget(self.btn_export)
+        
+        filter_row.addStretch()
+
+        # Searches the whole history, ignoring the date range
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Buscar objeto…")
+        self.search.setClearButtonEnabled(True)
+        self.search.setMinimumHeight(32)
+        self.search.setMinimumWidth(240)
+        self.search.textChanged.connect(self._on_search)
+        filter_row.addWidget(self.search)
+        lay.addLayout(filter_row)
+
+        self.model = HistoryTableModel(self)
+        self.proxy = HistoryFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        # Keep the model order (most recent first) until the user clicks a header
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.verticalHeader().setDefaultSectionSize(32)
+        # Set column widths - Objeto gets more space
+        header = self.table.horizontalHeader()
+        # Timestamps have a fixed width: sizing from a few rows is enough and
+        # keeps ResizeToContents from reading every row of the model
+        header.setResizeContentsPrecision(50)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)  # Objeto stretches
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Subiu
+        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Desceu
+        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Pronto
+        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # Status
+        self.table.setMinimumWidth(1000)
+        # Double-click: every status change of that objeto
+        self.table.doubleClicked.connect(self._show_timeline)
+        lay.addWidget(self.table)
+
+        # Totals from the store's running counters (independent of the filters)
+        self.summary_lbl = QLabel()
+        self.summary_lbl.setObjectName("summaryLabel")
+        lay.addWidget(self.summary_lbl)
+
+        # Dark title bar on Windows
+        self._set_dark_title_bar()
+
+        # Follow saves made anywhere in the app; subscribe before taking the rows
+        # so no change is missed (duplicates are ignored by the model)
+        store_notifier().changed.connect(self._on_store_changed)
+        self.finished.connect(lambda _: store_notifier().changed.disconnect(self._on_store_changed))
+        if get_store().loaded:
+            self.load()
+        else:
+            # Show rows as the snapshot is read instead of waiting for all of it
+            # No parent: the loading thread may outlive the dialog
+            self._loader = StoreLoader()
+            self._loader.page.connect(self._on_load_page)
+            self._loader.done.connect(self._on_load_done)
+            self._loader.start()
+
+    def _set_dark_title_bar(self):
+        try:
+            import ctypes
+            from ctypes import wintypes
+            hwnd = int(self.winId())
+            DWMWA_USE_IMMERSIVE_DARK_MODE = 20
+            ctypes.windll.dwmapi.DwmSetWindowAttribute(
+                hwnd,
+                DWMWA_USE_IMMERSIVE_DARK_MODE,
+                ctypes.byref(ctypes.c_int(1)),
+                ctypes.sizeof(ctypes.c_int)
+            )
+        except Exception:
+            pass
+
+    @diagnostics.timed('HistoryDialog.load')
+    def load(self):
+        # Get date range filter
+        start_date = self.date_start.date().toString("yyyy-MM-dd")
+        end_date = self.date_end.date().toString("yyyy-MM-dd")
+
+        # Most recent first, a page at a time as the table scrolls (only the
+        # monthly archives overlapping the range are opened)
+        store = get_store()
+        self.model.set_pager(lambda after, limit: store.page_range(start_date, end_date, after, limit))
+        self._update_summary()
+
+    def _update_summary(self):
+        summary = get_store().summary()
+        self.summary_lbl.setText(
+            f"Agora — {format_counts(summary['current'])}     "
+            f"Hoje — {format_counts(summary['today'])}     "
+            f"7 dias — {format_counts(summary['week'])}"
+        )
+
+    def _on_export(self):
+        start_date = self.date_start.date().toString("yyyy-MM-dd")
+        end_date = self.date_end.date().toString("yyyy-MM-dd")
+        export_history(
+            self, start_date, end_date,
+            on_done=lambda message: QMessageBox.information(self, "Exportar", message))
+
+    def _show_timeline(self, index):
+        entry = self.model.record(self.proxy.mapToSource(index).row())
+        events = get_store().timeline(entry.objeto)
+        lines = [f"{event.get('ts')} — {event.get('status')}" for event in events]
+        QMessageBox.information(
+            self, f"Linha do tempo — {entry.objeto}",
+            "\n".join(lines) or "Nenhuma alteração registrada.")
+
+    def _on_load_page(self, entries):
+        self.model.append_records([e for e in entries if self._in_view(e)])
+
+    def _on_load_done(self):
+        # Journal and archive applied: replace the preview with the exact rows
+        self._on_search(self.search.text())
+
+    def _on_filter(self):
+        if self.search.text():
+            # Clearing the search goes back to the date range
+            self.search.clear()
+        else:
+            self.load()
+
+    @diagnostics.timed('HistoryDialog.search')
+    def _on_search(self, text):
+        if not text.strip():
+            self.load()
+            return
+        # Matches by objeto, a page at a time like the date range
+        store = get_store()
+        self.model.set_pager(lambda after, limit: store.search(text, after, limit),
+                             cursor=lambda entry: entry.key)
+
+    def _in_view(self, entry) -> bool:
+        query = self.search.text()
+        if query.strip():
+            return ObjetoIndex.matches(entry.key, query)
+        start_date = self.date_start.date().toString("yyyy-MM-dd")
+        end_date = self.date_end.date().toString("yyyy-MM-dd")
+        return entry_in_date_range(entry, start_date, end_date)
+
+    def _on_store_changed(self, changes):
+        self.model.apply_changes([
+            change for change in changes
+            if self.model.contains(change[1]) or self._in_view(change[1])
+        ])
+        self._update_summary()
+
+
+class TransferTask(QObject):
+    """Runs an export or import on a background thread."""
+
+    finished = Signal(str)  # message for the user
+
+    _running = set()  # keeps tasks alive until they finish
+
+    def __init__(self, fn, args, done_text: str):
+        super().__init__()
+        self._fn = fn
+        self._args = args
+        self._done_text = done_text
+        self.finished.connect(lambda _: TransferTask._running.discard(self))
+
+    def start(self):
+        TransferTask._running.add(self)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            message = self._done_text.format(count=self._fn(*self._args))
+        except Exception as e:
+            message = f"Erro: {e}"
+        self.finished.emit(message)
+
+
+_SPREADSHEET_FILTER = "Planilhas (*.csv *.xlsx)"
+
+
+def export_history(parent=None, start_date=None, end_date=None, on_done=None):
+    """Ask for a file and export the records (of the date range, if given) to it."""
+    import transfer
+
+    path, _ = QFileDialog.getSaveFileName(parent, "Exportar histórico", "historico.csv", _SPREADSHEET_FILTER)
+    if not path:
+        return
+    task = TransferTask(transfer.export_records, (path, start_date, end_date),
+                        "{count} registros exportados para " + path)
+    if on_done is not None:
+        task.finished.connect(on_done)
+    task.start()
+
+
+def import_history(parent=None, on_done=None):
+    """Ask for a .csv/.xlsx file and save its rows."""
+    import transfer
+
+    path, _ = QFileDialog.getOpenFileName(parent, "Importar registros", "", _SPREADSHEET_FILTER)
+    if not path:
+        return
+    task = TransferTask(transfer.import_records, (path,), "{count} registros importados de " + path)
+    if on_done is not None:
+        task.finished.connect(on_done)
+    task.start()
@@ -1,85 +1,2108 @@
 import os
+import re
+import bisect
+import sys
 import json
+import time
+import atexit
+import zlib
+import contextlib
+import collections
+import threading
 import datetime as dt
+from typing import Optional
+
+import config
+import diagnostics
+from search_index import ObjetoIndex
+from stats import STATUSES, HistoryStats
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'data')
+# Snapshot of the active records, one JSON object per line, so it can be
+# read (and shown) a page at a time. Its last line records the row count and
+# how much of the event log it reflects; the snapshot it replaced is kept as
+# historico-snapshot.jsonl.prev for recovery.
+SNAPSHOT_FILE = os.path.join(DATA_DIR, 'historico-snapshot.jsonl')
+# Earlier snapshot format (a single JSON array); converted to SNAPSHOT_FILE
+# on first load and kept as historico.json.bak
 HIST_FILE = os.path.join(DATA_DIR, 'historico.json')
+# Append-only journal: one JSON object per line for each status change since
+# the last snapshot.
+JOURNAL_FILE = os.path.join(DATA_DIR, 'historico.jsonl')
+# Every status change ever saved, one JSON object per line; never rewritten,
+# so an objeto's full timeline survives compaction and archiving
+EVENTS_FILE = os.path.join(DATA_DIR, 'historico-events.jsonl')
+# "offset key" line per event of EVENTS_FILE, appended with it, so one
+# objeto's timeline is read without decoding the whole log
+EVENTS_INDEX = os.path.join(DATA_DIR, 'historico-events.idx')
+# Closed records ("Pronto" in an earlier month), one file per month:
+# archive/historico-YYYY-MM.jsonl, listed in archive/index.jsonl with the
+# first and last date they contain. Both are checksummed like the snapshot
+# and keep the copy they replaced as .prev; partitions and index written
+# before that are plain JSON (historico-YYYY-MM.json, index.json).
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'archive')
+# Used instead of the files above when storage_backend is 'sqlite'
+DB_FILE = os.path.join(DATA_DIR, 'historico.db')
+
+# Number of journal entries after which the journal is folded into the snapshot
+COMPACT_EVERY = 500
+# Records handed to a load progress callback at a time
+LOAD_PAGE = 500
+
+_STATUS_FIELDS = {
+    'subiu': 'Subiu',
+    'desceu': 'Desceu',
+    'pronto': 'Pronto',
+}
+
+
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+_EPOCH = dt.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+def normalize(objeto: str) -> str:
+    """Key used to match objeto names (case-insensitive)."""
+    return (objeto or '').upper()
+
+
+def to_epoch(ts: Optional[str]) -> Optional[int]:
+    """'YYYY-MM-DD[ HH:MM:SS]' -> seconds since 1970-01-01, in local wall-clock time."""
+    if not ts:
+        return None
+    days = dt.date(int(ts[0:4]), int(ts[5:7]), int(ts[8:10])).toordinal() - _EPOCH_ORDINAL
+    secs = days * 86400
+    if len(ts) >= 19:
+        secs += int(ts[11:13]) * 3600 + int(ts[14:16]) * 60 + int(ts[17:19])
+    return secs
+
+
+def from_epoch(secs: Optional[int]) -> Optional[str]:
+    if secs is None:
+        return None
+    return (_EPOCH + dt.timedelta(seconds=secs)).strftime(TS_FORMAT)
+
+
+def _first_day() -> int:
+    """Day number of the oldest day the summary counts changes for."""
+    return to_epoch(dt.date.today().isoformat()) // 86400 - HistoryStats.KEEP_DAYS + 1
+
+
+def _intern_status(status: Optional[str]) -> Optional[str]:
+    return sys.intern(status) if status else None
+
+
+class Record:
+    """One history entry, kept compact in memory.
+
+    Timestamps are ints (see to_epoch) and statuses are interned. get() and
+    item access return the stored string form, so read-only code written
+    against the JSON dicts keeps working; to_dict() is the storage shape.
+    """
+
+    __slots__ = ('objeto', 'subiu', 'desceu', 'pronto', 'status')
+
+    FIELDS = ('objeto', 'subiu', 'desceu', 'pronto', 'status')
+
+    def __init__(self, objeto: str, subiu=None, desceu=None, pronto=None, status=None):
+        self.objeto = objeto
+        self.subiu = subiu
+        self.desceu = desceu
+        self.pronto = pronto
+        self.status = status
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'Record':
+        return cls(
+            d.get('objeto') or '',
+            to_epoch(d.get('subiu')),
+            to_epoch(d.get('desceu')),
+            to_epoch(d.get('pronto')),
+            _intern_status(d.get('status')),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'objeto': self.objeto,
+            'subiu': from_epoch(self.subiu),
+            'desceu': from_epoch(self.desceu),
+            'pronto': from_epoch(self.pronto),
+            'status': self.status,
+        }
+
+    def copy(self) -> 'Record':
+        return Record(self.objeto, self.subiu, self.desceu, self.pronto, self.status)
+
+    @property
+    def key(self) -> str:
+        return normalize(self.objeto)
+
+    def get(self, field: str, default=None):
+        if field in _STATUS_FIELDS:
+            return from_epoch(getattr(self, field))
+        if field in ('objeto', 'status'):
+            return getattr(self, field)
+        return default
+
+    def __getitem__(self, field: str):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return self.get(field)
+
+    def keys(self):
+        return self.FIELDS
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Record({self.to_dict()!r})'
+
+    def latest(self) -> Optional[int]:
+        """The most recent of the three timestamps."""
+        return max((t for t in (self.subiu, self.desceu, self.pronto) if t is not None), default=None)
+
+    def in_range(self, lo: int, hi: int) -> bool:
+        """Any timestamp in [lo, hi)."""
+        return any(t is not None and lo <= t < hi for t in (self.subiu, self.desceu, self.pronto))
+
+
+def recency_key(entry: Record) -> tuple:
+    """Sort key putting the most recently changed entries first (ties by objeto).
+
+    Also the cursor of HistoryStore.page_range: a page starts after the
+    recency_key of the last entry of the previous one.
+    """
+    return -(entry.latest() or 0), entry.key
+
+
+def _day_bounds(start_date: str, end_date: str):
+    """Epoch bounds [lo, hi) covering two 'YYYY-MM-DD' dates, both included."""
+    return to_epoch(start_date), to_epoch(end_date) + 86400
+
+
+def _seed_events(entries) -> list:
+    """Events reconstructed from records saved before the event log existed.
+
+    Only the last time of each status survives in a record, so that is all
+    the seeded timeline can hold.
+    """
+    events = [
+        (getattr(e, field), e.objeto, status)
+        for e in entries
+        for field, status in _STATUS_FIELDS.items()
+        if getattr(e, field) is not None
+    ]
+    events.sort(key=lambda ev: ev[0])
+    return [{'objeto': o, 'status': st, 'ts': from_epoch(ts)} for ts, o, st in events]
+
+
+def _new_entry(objeto: str) -> Record:
+    return Record(objeto)
+
+
+def _apply_status(entry: Record, status: str, ts: int, keep_newer: bool = False) -> bool:
+    """Set the timestamp field and status of entry for the given status.
+
+    With keep_newer (imported or replayed times, which may be older than
+    what entry holds) a time older than the one already in that field is
+    ignored, and the status only changes when ts is the entry's newest
+    change. Returns whether the change was applied.
+    """
+    field = (status or '').lower()
+    if field not in _STATUS_FIELDS:
+        return False
+    if keep_newer:
+        current = getattr(entry, field)
+        if ts is None or (current is not None and ts < current):
+            return False
+        latest = entry.latest()
+        setattr(entry, field, ts)
+        if latest is None or ts >= latest:
+            entry.status = _STATUS_FIELDS[field]
+        return True
+    setattr(entry, field, ts)
+    entry.status = _STATUS_FIELDS[field]
+    return True
+
+
+def entry_in_date_range(entry, start_date: str, end_date: str) -> bool:
+    """Check if any timestamp in the entry falls within the date range."""
+    if isinstance(entry, Record):
+        return entry.in_range(*_day_bounds(start_date, end_date))
+    for field in _STATUS_FIELDS:
+        ts = entry.get(field)
+        if ts:
+            # Extract date part (YYYY-MM-DD) from timestamp
+            entry_date = ts.split(' ')[0]
+            if start_date <= entry_date <= end_date:
+                return True
+    return False
+
+
+def parse_line(text: str, default_status: str):
+    """Split a "nome | status" line into (objeto, status).
+
+    Without a valid status after the separator the whole text is the objeto
+    and default_status is used. Tabs (cells copied from a spreadsheet) are
+    accepted as separator too.
+    """
+    text = text.strip()
+    for sep in ('|', '\t'):
+        if sep in text:
+            parts = [p.strip() for p in text.split(sep, 1)]
+            if len(parts) == 2 and parts[1].lower() in _STATUS_FIELDS:
+                return parts[0], parts[1].capitalize()
+    return text, default_status
+
+
+# Appended to each JSON line: , "crc": "<crc32 of the line without it>"}
+_CRC_MARK = b', "crc": "'
+
+
+def _encode_line(row: dict) -> str:
+    """One JSON-lines line for row, carrying a CRC32 of its own UTF-8 text."""
+    text = json.dumps(row, ensure_ascii=False)
+    return f'{text[:-1]}, "crc": "{zlib.crc32(text.encode("utf-8")):08x}"}}\n'
+
+
+def _decode_line(line: bytes) -> dict:
+    """Parse a line written by _encode_line (or an older one without checksum).
+
+    Raises ValueError when the line is not valid JSON or its checksum does
+    not match, e.g. a torn write or a damaged disk block.
+    """
+    line = line.rstrip()
+    if line[-20:-10] == _CRC_MARK and line[-2:] == b'"}':
+        body = line[:-20] + b'}'
+        if zlib.crc32(body) != int(line[-10:-2], 16):
+            raise ValueError('checksum mismatch')
+        line = body
+    # json.loads is faster on str than on bytes
+    return json.loads(line.decode('utf-8'))
+
+
+def _is_checksummed(line: bytes) -> bool:
+    return line.rstrip()[-20:-10] == _CRC_MARK
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _fsync_dir(path: str):
+    """Make a rename in path's folder durable (POSIX; Windows has no directory fsync)."""
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _atomic_write_lines(path: str, rows, snapshot: Optional[int] = None, keep: Optional[str] = None,
+                        trailer: Optional[dict] = None) -> int:
+    """Write one checksummed JSON object per line to a temp file and rename
+    it over path, so readers never see a partial file.
+
+    With snapshot (the event log size the rows reflect) a last line records
+    the row count and that offset, plus any trailer fields, so a truncated
+    file is detected on load. If keep is given, the file being replaced is
+    moved there first. Returns the number of rows written.
+    """
+    tmp = path + '.tmp'
+    count = 0
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(_encode_line(row))
+            count += 1
+        if snapshot is not None:
+            f.write(_encode_line({'snapshot': {'count': count, 'events': snapshot, **(trailer or {})}}))
+        f.flush()
+        os.fsync(f.fileno())
+    if keep is not None and os.path.exists(path):
+        os.replace(path, keep)
+    os.replace(tmp, path)
+    _fsync_dir(path)
+    return count
 
 
-def _ensure_storage():
-    os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.exists(HIST_FILE):
-        with open(HIST_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f, ensure_ascii=False, indent=2)
+def _read_checked(path: str):
+    """(rows, ok) of a file written by _atomic_write_lines with a trailer.
 
+    ok is False when a line fails its checksum or the row count of the last
+    line is missing or wrong; rows then holds the lines that could be read.
+    Raises FileNotFoundError.
+    """
+    rows, bad, trailer = [], 0, None
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = _decode_line(line)
+            except ValueError:
+                bad += 1
+                continue
+            if 'snapshot' in row:
+                trailer = row['snapshot']
+            else:
+                rows.append(row)
+    return rows, not bad and trailer is not None and trailer.get('count') == len(rows)
+
+
+def _objeto_text(key: str) -> str:
+    """How a row of key shows in a file uppercased as text (see _find_rows)."""
+    return ('"objeto": ' + json.dumps(key, ensure_ascii=False)).upper()
+
+
+def _find_rows(path: str, key: str) -> list:
+    """Rows of a JSON-lines file whose objeto is key.
+
+    The file is searched as text and only the lines that mention key are
+    decoded, which costs a fraction of reading every row. Raises
+    FileNotFoundError, or ValueError for a damaged matching line.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Uppercasing keeps the line breaks, so a match's line number holds
+    text = data.decode('utf-8', 'replace').upper()
+    needle = _objeto_text(key)
+    rows, lines = [], None
+    i = text.find(needle)
+    while i >= 0:
+        if lines is None:
+            lines = data.split(b'\n')
+        row = _decode_line(lines[text.count('\n', 0, i)])
+        if normalize(row.get('objeto', '')) == key:
+            rows.append(row)
+        i = text.find(needle, i + len(needle))
+    return rows
+
+
+def iter_json_lines(path: str):
+    """Yield the objects of a JSON-lines file one at a time; bad lines are skipped."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield _decode_line(line)
+            except ValueError:
+                continue
 
-def load_history():
-    _ensure_storage()
+
+_ARRAY_SEPARATORS = re.compile(r'[\s,\[]*')
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16, strict: bool = True):
+    """Yield the items of a JSON array file without reading it whole.
+
+    Raises ValueError at a truncated end (the array is never closed), after
+    yielding the items before it; with strict=False it stops there instead.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf, pos, eof = '', 0, False
+        while True:
+            pos = _ARRAY_SEPARATORS.match(buf, pos).end()
+            if buf.startswith(']', pos):
+                return
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    if strict:
+                        raise ValueError(f'{path}: truncated JSON array')
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+
+
+def convert_history(src: str, dst: str) -> int:
+    """Rewrite a JSON array history file as a JSON-lines snapshot; returns the record count.
+
+    A truncated array (a crash while it was written) still has the records
+    before the cut converted, but into a snapshot without the final row
+    count, so the load treats it as damaged and goes through recovery.
+    """
     try:
-        with open(HIST_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f) or []
+        return _atomic_write_lines(dst, iter_json_array(src), snapshot=0)
+    except ValueError:
+        return _atomic_write_lines(dst, iter_json_array(src, strict=False))
+
+
+class FileLock:
+    """Advisory lock held by one OPECBrain process at a time (re-entrant)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+            try:
+                if os.name == 'nt':
+                    import msvcrt
+                    # Retries for about 10 seconds before raising
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            except Exception:
+                os.close(fd)
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if os.name == 'nt':
+                    import msvcrt
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        return False
+
+
+class JsonBackend:
+    """Snapshot in historico-snapshot.jsonl plus an append-only journal in historico.jsonl.
+
+    Every read and write happens under historico.lock, so several processes
+    can share the data folder. Each process remembers how much of the journal
+    it has applied and reads only the tail written by others.
+
+    The snapshot only holds the active records; compaction moves records
+    closed in earlier months to the monthly archive partitions.
+
+    Every line carries a checksum and the snapshot ends with its row count.
+    A file failing those checks is listed in damaged; recover() then
+    rebuilds from the last good snapshot plus the event log, and the damaged
+    file is kept aside, never overwritten.
+
+    Archive partitions and their index get the same checks. A damaged
+    partition is read as its .prev copy overlaid with its readable lines, a
+    damaged index is rebuilt from the partitions, and repair_archive()
+    writes them back (keeping the damaged files aside as well).
+    """
+
+    archives = True
+    # Changes go to a journal every store replays, so they can be appended
+    # and looked up without loading the snapshot (see HistoryStore.log_many)
+    journaled = True
+    # Archive partitions kept parsed in memory
+    PARTITION_CACHE = 12
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.hist_file = os.path.join(data_dir, os.path.basename(SNAPSHOT_FILE))
+        self.prev_file = self.hist_file + '.prev'
+        self.legacy_file = os.path.join(data_dir, os.path.basename(HIST_FILE))
+        self.journal_file = os.path.join(data_dir, os.path.basename(JOURNAL_FILE))
+        self.events_file = os.path.join(data_dir, os.path.basename(EVENTS_FILE))
+        self.archive_dir = os.path.join(data_dir, os.path.basename(ARCHIVE_DIR))
+        self.manifest_file = os.path.join(self.archive_dir, 'index.jsonl')
+        self.legacy_manifest = os.path.join(self.archive_dir, 'index.json')
+        self._file_lock = FileLock(os.path.join(data_dir, 'historico.lock'))
+        self._partitions = collections.OrderedDict()  # period -> (mtime_ns, entries)
+        # Archives are read outside the store lock (queries, search index build)
+        self._partitions_lock = threading.Lock()
+        self.pending = 0          # journal entries not yet folded into the snapshot
+        self._offset = 0          # bytes of the journal already applied
+        self._snapshot_id = None  # identity of the snapshot that was loaded
+        self.events_index = os.path.join(data_dir, os.path.basename(EVENTS_INDEX))
+        self._events_size_indexed = None  # (offset index size, log offset it covers) after our last update
+        self.damaged = set()        # files that failed their checks since the last recover()
+        self.archive_damaged = set()  # archive files to rewrite in repair_archive()
+        self._rebuilt_manifest = None  # index rebuilt from the partitions, until written
+        self._trailer = None        # last line of the snapshot read last
+        # Group commit: appends are fsynced at most once per interval
+        self.fsync_interval = float(config.get('fsync_interval') or 0)
+        self._fsync_lock = threading.Lock()
+        self._fsync_timer = None
+        self._last_fsync = 0.0
+
+    def lock(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        return self._file_lock
+
+    def watch_paths(self) -> list:
+        return [self.hist_file, self.journal_file]
+
+    def _stat_id(self):
+        # Changes when another process compacts (the snapshot is replaced)
+        try:
+            st = os.stat(self.hist_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_storage(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        if os.path.exists(self.hist_file):
+            return
+        if os.path.exists(self.prev_file):
+            # Crashed between the two renames of compact(); the journal still
+            # holds everything written after the previous snapshot
+            os.replace(self.prev_file, self.hist_file)
+        elif os.path.exists(self.legacy_file):
+            # History written in the single-array format
+            convert_history(self.legacy_file, self.hist_file)
+            os.replace(self.legacy_file, self.legacy_file + '.bak')
+        else:
+            _atomic_write_lines(self.hist_file, [], snapshot=self._events_size())
+
+    def _events_size(self) -> int:
+        try:
+            return os.path.getsize(self.events_file)
+        except FileNotFoundError:
+            return 0
+
+    def _iter_snapshot(self, path: Optional[str] = None):
+        """Yield the records of a snapshot file, checking it along the way.
+
+        The file is added to damaged if a line fails its checksum or the
+        final row count is missing or wrong. Snapshots written before
+        checksums existed have neither and are taken as they are.
+        """
+        path = path or self.hist_file
+        self._trailer = None
+        count, bad, checked = 0, 0, False
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = _decode_line(line)
+                except ValueError:
+                    bad += 1
+                    continue
+                checked = checked or _is_checksummed(line)
+                if 'snapshot' in row:
+                    self._trailer = row['snapshot']
+                    continue
+                count += 1
+                yield Record.from_dict(row)
+        trailer = self._trailer
+        if trailer is None:
+            # Cut short (or emptied) after a checksummed snapshot was written
+            damaged = checked or (count == 0 and os.path.exists(self.prev_file))
+        else:
+            damaged = trailer.get('count') != count
+        if bad or damaged:
+            self.damaged.add(path)
+
+    def _read_journal(self, offset: int = 0):
+        """Return (events, end offset) for the complete lines after offset."""
+        try:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        # An unterminated last line is a torn write; leave it unread
+        end = data.rfind(b'\n') + 1
+        events = []
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(_decode_line(line))
+            except ValueError:
+                # The event log has the complete line (it is written first)
+                self.damaged.add(self.journal_file)
+        return events, offset + end
+
+    def load(self):
+        """Return (entries, events): the snapshot and the journal to replay on it.
+
+        entries is read lazily, line by line; consume it under lock().
+        """
+        self._ensure_storage()
+        self._snapshot_id = self._stat_id()
+        events, self._offset = self._read_journal()
+        self.pending = len(events)
+        return self._iter_snapshot(), events
+
+    def sync(self):
+        """Return (reset, entries, events) written by other processes since load/sync.
+
+        reset is True when the snapshot was replaced; entries and events then
+        describe the whole history again.
+        """
+        if self._stat_id() != self._snapshot_id:
+            entries, events = self.load()
+            return True, entries, events
+        events, self._offset = self._read_journal(self._offset)
+        self.pending += len(events)
+        return False, [], events
+
+    def has_events(self) -> bool:
+        return os.path.exists(self.events_file)
+
+    def snapshot_days(self, first: int) -> dict:
+        """Status changes per day from day first on, as counted when the
+        snapshot just read was written (the journal is not included).
+
+        A snapshot written before it carried them is counted from the event
+        log instead, up to the journal, until the next compaction.
+        """
+        trailer = self._trailer or {}
+        days = trailer.get('days')
+        if days is None:
+            return self.count_days(first, trailer.get('events', 0))
+        counts = {to_epoch(date) // 86400: collections.Counter(c) for date, c in days.items()}
+        return {day: c for day, c in counts.items() if day >= first}
+
+    def count_days(self, first: int, end: Optional[int] = None) -> dict:
+        """Status changes per day from day first on, counted from the event
+        log (up to offset end); reads the whole log."""
+        since = from_epoch(first * 86400)[:10]
+        counts = {}
+        for event in self._read_events(0, end):
+            ts = event.get('ts')
+            if ts and ts >= since and event.get('status'):
+                counts.setdefault(to_epoch(ts) // 86400, collections.Counter())[event['status']] += 1
+        return counts
+
+    def seed_events(self, entries: list):
+        if not self.has_events():
+            _atomic_write_lines(self.events_file, _seed_events(entries))
+
+    def _read_events(self, offset: int = 0, end: Optional[int] = None) -> list:
+        """Events of the log from offset on (from the start if it is shorter),
+        up to offset end if given."""
+        if offset > self._events_size():
+            offset = 0
+        events = []
+        try:
+            f = open(self.events_file, 'rb')
+        except FileNotFoundError:
+            return events
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # torn last line
+                offset += len(line)
+                if end is not None and offset > end:
+                    break
+                try:
+                    events.append(_decode_line(line))
+                except ValueError:
+                    continue
+        return events
+
+    def recover(self):
+        """Return (entries, events) to rebuild the active records from.
+
+        entries is the newest snapshot that passes its checks (the current or
+        the previous one) and events the event log written after it. When
+        neither passes, the readable lines of the current one are used with
+        the whole event log. Damaged files are moved aside as
+        <name>.corrupt-<time>, never deleted; the caller compacts afterwards
+        to write a clean snapshot.
+        """
+        stamp = dt.datetime.now().strftime('%Y%m%d-%H%M%S')
+        salvaged = []
+        if self.hist_file in self.damaged:
+            salvaged = list(self._iter_snapshot(self.hist_file))
+        for path in sorted(self.damaged):
+            if os.path.exists(path):
+                os.replace(path, f'{path}.corrupt-{stamp}')
+        self.damaged.clear()
+        entries, offset = salvaged, 0
+        for path in (self.hist_file, self.prev_file):
+            if not os.path.exists(path):
+                continue
+            rows = list(self._iter_snapshot(path))
+            if path not in self.damaged:
+                # A snapshot without a trailer predates the offsets: replay the whole log
+                entries, offset = rows, (self._trailer or {}).get('events', 0)
+                break
+        self.damaged.clear()
+        self._offset = 0
+        return entries, self._read_events(offset)
+
+    @staticmethod
+    def _append_to(path: str, data: bytes) -> int:
+        """Append data to path; returns the offset it starts at."""
+        torn = False
+        try:
+            with open(path, 'rb') as f:
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    # Terminate a torn line left by a crashed writer
+                    torn = f.read(1) != b'\n'
+        except FileNotFoundError:
+            pass
+        with open(path, 'ab') as f:
+            if torn:
+                f.write(b'\n')
+            start = f.tell()
+            f.write(data)
+            f.flush()
+        return start
+
+    def _read_offsets(self):
+        """(complete lines of the offset index, log offset they cover up to).
+
+        The covered offset is None when the last indexed line no longer
+        matches the log (e.g. the log was replaced), so the index must be
+        rebuilt.
+        """
+        try:
+            with open(self.events_index, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return b'', 0
+        data = data[:data.rfind(b'\n') + 1]
+        if not data:
+            return data, 0
+        last = data[data.rfind(b'\n', 0, -1) + 1:]
+        offset, _, key = last.partition(b' ')
+        try:
+            with open(self.events_file, 'rb') as f:
+                f.seek(int(offset))
+                line = f.readline()
+            if line.endswith(b'\n') and json.dumps(normalize(_decode_line(line).get('objeto', '')),
+                                                   ensure_ascii=False).encode('utf-8') + b'\n' == key:
+                return data, int(offset) + len(line)
+        except (OSError, ValueError):
+            pass
+        return data, None
+
+    @staticmethod
+    def _offset_line(offset: int, key: str) -> bytes:
+        return f'{offset} {json.dumps(key, ensure_ascii=False)}\n'.encode('utf-8')
+
+    def _index_appended(self, start: int, lines: list, events: list):
+        """Add the lines of events just appended at start to the offset index;
+        call under lock()."""
+        cached = self._events_size_indexed
+        if cached is None or cached[0] != _file_size(self.events_index) or cached[1] != start:
+            # Written by another process, or behind the log: catch up from the log
+            self.index_events()
+            return
+        out = []
+        for line, event in zip(lines, events):
+            out.append(self._offset_line(start, normalize(event.get('objeto', ''))))
+            start += len(line)
+        data = b''.join(out)
+        with open(self.events_index, 'ab') as f:
+            f.write(data)
+        self._events_size_indexed = (cached[0] + len(data), start)
+
+    def index_events(self):
+        """Bring the offset index up to date with the event log; call under lock().
+
+        Reads only the log lines written since the index was last updated
+        (the whole log the first time, or if it was replaced).
+        """
+        data, covered = self._read_offsets()
+        if covered is None or covered > self._events_size():
+            data, covered = b'', 0
+        if len(data) != _file_size(self.events_index):
+            # Drop a torn last line, or an index of a replaced log
+            with open(self.events_index, 'r+b' if data else 'wb') as f:
+                f.truncate(len(data))
+        out = []
+        offset = covered
+        try:
+            with open(self.events_file, 'rb') as f:
+                f.seek(covered)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # torn last line
+                    try:
+                        out.append(self._offset_line(offset, normalize(_decode_line(line).get('objeto', ''))))
+                    except ValueError:
+                        pass
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        added = b''.join(out)
+        with open(self.events_index, 'ab') as f:
+            f.write(added)
+        self._events_size_indexed = (len(data) + len(added), offset)
+
+    def find_events(self, key: str) -> Optional[list]:
+        """Events of one objeto, in log order, from the offset index; reads
+        only that objeto's lines and takes no lock.
+
+        None when the index does not cover the whole log (see index_events()).
+        """
+        data, covered = self._read_offsets()
+        if covered is None or covered != self._events_size():
+            return None
+        pattern = b' ' + json.dumps(key, ensure_ascii=False).encode('utf-8') + b'\n'
+        offsets = []
+        i = data.find(pattern)
+        while i >= 0:
+            start = data.rfind(b'\n', 0, i) + 1
+            if data[start:i].isdigit():
+                offsets.append(int(data[start:i]))
+            i = data.find(pattern, i + len(pattern))
+        events = []
+        if offsets:
+            with open(self.events_file, 'rb') as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    event = _decode_line(f.readline())
+                    if normalize(event.get('objeto', '')) != key:
+                        return None
+                    events.append(event)
+        return events
+
+    def timeline(self, key: str) -> list:
+        """Events of one objeto, in log order; call under lock()."""
+        events = self.find_events(key)
+        if events is None:
+            self.index_events()
+            events = self.find_events(key)
+        return events or []
+
+    def append(self, events: list, entries: list):
+        """Persist a batch of events with a single write to the journal (and the event log)."""
+        lines = [_encode_line(event).encode('utf-8') for event in events]
+        data = b''.join(lines)
+        self._index_appended(self._append_to(self.events_file, data), lines, events)
+        with open(self.journal_file, 'ab') as f:
+            if os.fstat(f.fileno()).st_size > self._offset:
+                # Terminate a torn line left by a crashed writer
+                f.write(b'\n')
+            f.write(data)
+            f.flush()
+            self._offset = f.tell()
+        self.pending += len(events)
+        self._schedule_fsync()
+
+    def _schedule_fsync(self):
+        """fsync the logs now, or once the current interval ends if one just ran.
+
+        Appends are already in the OS cache, so a crash of the app loses
+        nothing; the interval only bounds what a power failure could take.
+        """
+        with self._fsync_lock:
+            if self._fsync_timer is not None:
+                return  # this write rides along with the scheduled fsync
+            wait = self._last_fsync + self.fsync_interval - time.monotonic()
+            if wait > 0:
+                self._fsync_timer = threading.Timer(wait, self.flush)
+                self._fsync_timer.daemon = True
+                self._fsync_timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """fsync the journal and the event log."""
+        with self._fsync_lock:
+            if self._fsync_timer is not None:
+                self._fsync_timer.cancel()
+                self._fsync_timer = None
+            for path in (self.events_file, self.journal_file):
+                try:
+                    with open(path, 'ab') as f:
+                        os.fsync(f.fileno())
+                except OSError:
+                    pass
+            self._last_fsync = time.monotonic()
+
+    def log(self, events: list):
+        """Append events to the event log and the journal without having
+        loaded the snapshot; call under lock()."""
+        self._ensure_storage()
+        lines = [_encode_line(event).encode('utf-8') for event in events]
+        data = b''.join(lines)
+        self._index_appended(self._append_to(self.events_file, data), lines, events)
+        self._append_to(self.journal_file, data)
+        self._schedule_fsync()
+
+    def find(self, key: str):
+        """(snapshot row of key or None, journal events of key), without
+        reading the other rows; call under lock(). Raises ValueError if a
+        line of key is damaged."""
+        self._ensure_storage()
+        rows = _find_rows(self.hist_file, key)
+        events, _ = self._read_journal()
+        return (rows[-1] if rows else None), [e for e in events if normalize(e.get('objeto', '')) == key]
+
+    def find_archived(self, key: str) -> Optional[Record]:
+        """The entry of key in the newest archive partition holding it.
+
+        Partitions are searched as text, newest first, and only the lines
+        that mention key are decoded (the whole partition if it is plain
+        JSON or such a line is damaged).
+        """
+        needle = _objeto_text(key)
+        for period, _ in reversed(self.archive_periods()):
+            path = self._partition_path(period)
+            if path is None:
+                continue
+            if path.endswith('.jsonl'):
+                try:
+                    rows = _find_rows(path, key)
+                except ValueError:
+                    pass
+                else:
+                    if rows:
+                        return Record.from_dict(rows[-1])
+                    continue
+            else:
+                with open(path, 'rb') as f:
+                    if needle not in f.read().decode('utf-8', 'replace').upper():
+                        continue
+            for entry in self.read_partition(period):
+                if entry.key == key:
+                    return entry
+        return None
+
+    def compact(self, records: list, days: Optional[dict] = None):
+        """Fold the journal into the snapshot file and truncate the journal.
+
+        days (day number -> status counts) is kept in the trailer for
+        snapshot_days().
+        """
+        self._ensure_storage()
+        trailer = None
+        if days is not None:
+            trailer = {'days': {from_epoch(day * 86400)[:10]: dict(c) for day, c in sorted(days.items())}}
+        _atomic_write_lines(self.hist_file, (r.to_dict() for r in records),
+                            snapshot=self._events_size(), keep=self.prev_file, trailer=trailer)
+        # Replaying the journal again on the new snapshot is harmless, so a
+        # crash before this truncation loses nothing
+        open(self.journal_file, 'w', encoding='utf-8').close()
+        self._snapshot_id = self._stat_id()
+        self._offset = 0
+        self.pending = 0
+
+    def query_range(self, start_date: str, end_date: str):
+        # No index on disk: the store filters its cached entries
+        return None
+
+    def _partition_file(self, period: str) -> str:
+        return os.path.join(self.archive_dir, f'historico-{period}.jsonl')
+
+    def _partition_path(self, period: str) -> Optional[str]:
+        """The partition file of period on disk (checksummed, else plain JSON), if any."""
+        path = self._partition_file(period)
+        if os.path.exists(path):
+            return path
+        legacy = path[:-1]
+        return legacy if os.path.exists(legacy) else None
+
+    def _archived_periods(self) -> list:
+        """Periods with a partition file, from the folder itself (not the index)."""
+        try:
+            names = os.listdir(self.archive_dir)
+        except FileNotFoundError:
+            return []
+        found = re.compile(r'historico-(\d{4}-\d{2})\.jsonl?$')
+        return sorted({m.group(1) for m in map(found.match, names) if m})
+
+    @staticmethod
+    def _read_rows(path: str):
+        """(rows, ok) of an archive file in either format; raises FileNotFoundError."""
+        with open(path, 'rb') as f:
+            head = f.read(64).lstrip()
+        if not head.startswith(b'['):
+            return _read_checked(path)
+        # Plain JSON array (or its .prev copy after conversion)
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                return json.load(f) or [], True
+            except ValueError:
+                return [], False
+
+    def _read_manifest(self) -> dict:
+        if self._rebuilt_manifest is not None:
+            return self._rebuilt_manifest
+        try:
+            rows, ok = _read_checked(self.manifest_file)
+            manifest = {row.pop('period'): row for row in rows}
+        except FileNotFoundError:
+            try:
+                with open(self.legacy_manifest, 'r', encoding='utf-8') as f:
+                    manifest, ok = json.load(f) or {}, True
+            except FileNotFoundError:
+                # No index is only right when there are no partitions either
+                manifest, ok = {}, not self._archived_periods()
+            except ValueError:
+                manifest, ok = {}, False
+        if ok:
+            return manifest
+        self.archive_damaged.add(self.manifest_file)
+        self._rebuilt_manifest = {
+            period: self._partition_info(period, self.read_partition(period))
+            for period in self._archived_periods()
+        }
+        return self._rebuilt_manifest
+
+    def read_partition(self, period: str) -> list:
+        path = self._partition_path(period)
+        if path is None:
+            return []
+        mtime = os.stat(path).st_mtime_ns
+        with self._partitions_lock:
+            cached = self._partitions.get(period)
+            if cached is not None and cached[0] == mtime:
+                self._partitions.move_to_end(period)
+                return cached[1]
+        rows, ok = self._read_rows(path)
+        if not ok:
+            # The copy it replaced, updated with whatever lines are still readable
+            try:
+                prev, _ = self._read_rows(path + '.prev')
+            except FileNotFoundError:
+                prev = []
+            merged = {normalize(row.get('objeto', '')): row for row in prev}
+            merged.update((normalize(row.get('objeto', '')), row) for row in rows)
+            rows = list(merged.values())
+            self.archive_damaged.add(path)
+        entries = [Record.from_dict(d) for d in rows]
+        with self._partitions_lock:
+            self._partitions[period] = (mtime, entries)
+            while len(self._partitions) > self.PARTITION_CACHE:
+                self._partitions.popitem(last=False)
+        return entries
+
+    def _write_partition(self, period: str, entries: list):
+        path = self._partition_file(period)
+        legacy = path[:-1]
+        keep = path + '.prev'
+        if os.path.exists(legacy):
+            # Converted: the plain JSON file becomes the previous copy
+            os.replace(legacy, keep)
+            keep = None
+        _atomic_write_lines(path, (e.to_dict() for e in entries), snapshot=0, keep=keep)
+
+    def _write_manifest(self, manifest: dict):
+        _atomic_write_lines(self.manifest_file,
+                            (dict(period=period, **info) for period, info in sorted(manifest.items())),
+                            snapshot=0, keep=self.manifest_file + '.prev')
+        if os.path.exists(self.legacy_manifest):
+            os.replace(self.legacy_manifest, self.legacy_manifest + '.bak')
+        self._rebuilt_manifest = None
+
+    def _partition_info(self, period: str, entries: list) -> dict:
+        stamps = [t for e in entries for t in (e.subiu, e.desceu, e.pronto) if t is not None]
+        return dict(
+            file=os.path.basename(self._partition_file(period)),
+            count=len(entries),
+            first=from_epoch(min(stamps))[:10] if stamps else f'{period}-01',
+            last=from_epoch(max(stamps))[:10] if stamps else f'{period}-01',
+            **self._partition_stats(entries),
+        )
+
+    def repair_archive(self):
+        """Rewrite the archive files that failed their checks; call under lock().
+
+        Damaged files are moved aside as <name>.corrupt-<time>, never deleted.
+        """
+        if not self.archive_damaged:
+            return
+        stamp = dt.datetime.now().strftime('%Y%m%d-%H%M%S')
+        manifest = self._read_manifest()
+        for path in sorted(self.archive_damaged - {self.manifest_file}):
+            period = re.search(r'(\d{4}-\d{2})\.jsonl?$', path).group(1)
+            entries = self.read_partition(period)
+            if os.path.exists(path):
+                os.replace(path, f'{path}.corrupt-{stamp}')
+            self._write_partition(period, entries)
+            manifest[period] = self._partition_info(period, entries)
+        if self.manifest_file in self.archive_damaged:
+            for path in (self.manifest_file, self.legacy_manifest):
+                if os.path.exists(path):
+                    os.replace(path, f'{path}.corrupt-{stamp}')
+        self._write_manifest(manifest)
+        self.archive_damaged.clear()
+
+    def archive(self, entries: list):
+        """Merge closed entries into the partition of the month they were closed in."""
+        by_period = {}
+        for entry in entries:
+            by_period.setdefault(from_epoch(entry.pronto)[:7], []).append(entry)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self.repair_archive()
+        manifest = self._read_manifest()
+        for period, new in sorted(by_period.items()):
+            merged = {e.key: e for e in self.read_partition(period)}
+            for entry in new:
+                old = merged.get(entry.key)
+                if old is not None:
+                    # Keep timestamps the archived copy has and this one lacks
+                    entry = entry.copy()
+                    for field in _STATUS_FIELDS:
+                        if getattr(entry, field) is None:
+                            setattr(entry, field, getattr(old, field))
+                merged[entry.key] = entry
+            part = list(merged.values())
+            self._write_partition(period, part)
+            manifest[period] = self._partition_info(period, part)
+        self._write_manifest(manifest)
+
+    @staticmethod
+    def _partition_stats(entries: list) -> dict:
+        stats = HistoryStats()
+        for entry in entries:
+            stats.add(entry)
+        return {'statuses': dict(stats.by_status)}
+
+    def archive_stats(self) -> collections.Counter:
+        """Archived records per status, from the manifest."""
+        by_status = collections.Counter()
+        for period, info in self._read_manifest().items():
+            if 'statuses' not in info:
+                # Partition archived before the manifest kept counts
+                info = self._partition_stats(self.read_partition(period))
+            by_status.update(info['statuses'])
+        return by_status
+
+    def archive_periods(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list:
+        """(period, manifest info) of the partitions overlapping the date range, oldest first."""
+        return [
+            (period, info) for period, info in sorted(self._read_manifest().items())
+            if not (start_date and info['last'] < start_date)
+            and not (end_date and info['first'] > end_date)
+        ]
+
+    def iter_archive(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """Yield the entries of each partition overlapping the date range (all without one)."""
+        for period, _ in self.archive_periods(start_date, end_date):
+            yield self.read_partition(period)
+
+    def read_archive(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list:
+        """Entries of the partitions overlapping the date range (all of them without one)."""
+        entries = []
+        for part in self.iter_archive(start_date, end_date):
+            entries.extend(part)
+        return entries
+
+
+class SqliteBackend:
+    """One row per objeto in historico.db, with indexed timestamp columns.
+
+    Each write stamps its rows with a new rev, so a process can pick up
+    rows written by others with an indexed rev > last_seen query.
+    """
+
+    def __init__(self, data_dir: str, migrate: bool = True):
+        import sqlite3
+
+        self.data_dir = data_dir
+        self.db_file = os.path.join(data_dir, os.path.basename(DB_FILE))
+        self.pending = 0
+        self._rev = 0  # highest rev applied to the store
+        self._depth = 0
+        os.makedirs(data_dir, exist_ok=True)
+        is_new = not os.path.exists(self.db_file)
+        # Writes may come from a worker thread; the store serializes access
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False, timeout=10)
+        self._events_seeded = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events'"
+        ).fetchone() is not None
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                seq INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                objeto TEXT NOT NULL,
+                subiu TEXT,
+                desceu TEXT,
+                pronto TEXT,
+                status TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_subiu ON records(subiu);
+            CREATE INDEX IF NOT EXISTS idx_records_desceu ON records(desceu);
+            CREATE INDEX IF NOT EXISTS idx_records_pronto ON records(pronto);
+            CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY,
+                key TEXT NOT NULL,
+                objeto TEXT NOT NULL,
+                status TEXT,
+                ts TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_key ON events(key, seq);
+            CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+        """)
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(records)')]
+        if 'rev' not in columns:
+            self.conn.executescript("""
+                ALTER TABLE records ADD COLUMN rev INTEGER NOT NULL DEFAULT 0;
+                CREATE INDEX IF NOT EXISTS idx_records_rev ON records(rev);
+            """)
+        if is_new and migrate:
+            # First use of the SQLite backend: carry over the JSON history
+            json_store = HistoryStore(data_dir, backend='json')
+            self.import_entries(json_store.all_records())
+            self.import_events(iter_json_lines(json_store.backend.events_file))
+
+    def import_entries(self, entries, rev: int = 0):
+        with self.conn:
+            self.conn.executemany(
+                self._UPSERT,
+                [self._row(entry, rev) for entry in entries],
+            )
+
+    def import_events(self, events):
+        with self.conn:
+            self.conn.executemany(self._INSERT_EVENT, [self._event_row(e) for e in events])
+        self._events_seeded = True
+
+    _INSERT_EVENT = 'INSERT INTO events (key, objeto, status, ts) VALUES (?, ?, ?, ?)'
+
+    @staticmethod
+    def _event_row(event: dict) -> tuple:
+        objeto = event.get('objeto', '')
+        return (normalize(objeto), objeto, event.get('status'), event.get('ts'))
+
+    def has_events(self) -> bool:
+        return self._events_seeded
+
+    def seed_events(self, entries: list):
+        # Runs inside lock(): no commit of its own
+        self.conn.executemany(self._INSERT_EVENT, [self._event_row(e) for e in _seed_events(entries)])
+        self._events_seeded = True
+
+    def find_events(self, key: str) -> None:
+        # The connection is shared with the writer: always go through timeline()
+        return None
+
+    def timeline(self, key: str) -> list:
+        cur = self.conn.execute(
+            'SELECT objeto, status, ts FROM events WHERE key = ? ORDER BY seq', (key,))
+        return [{'objeto': o, 'status': st, 'ts': ts} for o, st, ts in cur]
+
+    def count_days(self, first: int, end: Optional[int] = None) -> dict:
+        cur = self.conn.execute(
+            'SELECT substr(ts, 1, 10), status, COUNT(*) FROM events WHERE ts >= ? GROUP BY 1, 2',
+            (from_epoch(first * 86400)[:10],))
+        counts = {}
+        for date, status, n in cur:
+            if status:
+                counts.setdefault(to_epoch(date) // 86400, collections.Counter())[status] += n
+        return counts
+
+    def snapshot_days(self, first: int) -> dict:
+        # load() replays nothing: every event is in the table
+        return self.count_days(first)
+
+    _UPSERT = """
+        INSERT INTO records (key, objeto, subiu, desceu, pronto, status, rev)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            subiu = excluded.subiu,
+            desceu = excluded.desceu,
+            pronto = excluded.pronto,
+            status = excluded.status,
+            rev = excluded.rev
+    """
+
+    _COLUMNS = 'objeto, subiu, desceu, pronto, status'
+
+    @staticmethod
+    def _row(entry: Record, rev: int) -> tuple:
+        return (
+            entry.key,
+            entry.objeto,
+            from_epoch(entry.subiu),
+            from_epoch(entry.desceu),
+            from_epoch(entry.pronto),
+            entry.status,
+            rev,
+        )
+
+    @staticmethod
+    def _entries(cur) -> list:
+        return [
+            Record(o, to_epoch(s), to_epoch(d), to_epoch(p), _intern_status(st))
+            for o, s, d, p, st in cur
+        ]
+
+    def _max_rev(self) -> int:
+        return self.conn.execute('SELECT COALESCE(MAX(rev), 0) FROM records').fetchone()[0]
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Write transaction; SQLite serializes it against other processes."""
+        if self._depth == 0:
+            self.conn.execute('BEGIN IMMEDIATE')
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.rollback()
+            raise
+        else:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.commit()
+
+    def watch_paths(self) -> list:
+        return [self.db_file]
+
+    def load(self):
+        self._rev = self._max_rev()
+        cur = self.conn.execute(f'SELECT {self._COLUMNS} FROM records ORDER BY seq')
+        return self._entries(cur), []
+
+    def sync(self):
+        cur = self.conn.execute(
+            f'SELECT {self._COLUMNS}, rev FROM records WHERE rev > ? ORDER BY rev, seq',
+            (self._rev,),
+        )
+        rows = cur.fetchall()
+        if rows:
+            self._rev = rows[-1][-1]
+        return False, self._entries(row[:-1] for row in rows), []
+
+    def append(self, events: list, entries: list):
+        """Upsert the updated entries inside the current write transaction."""
+        rev = self._max_rev() + 1
+        self.conn.executemany(self._INSERT_EVENT, [self._event_row(e) for e in events])
+        self.conn.executemany(self._UPSERT, [self._row(entry, rev) for entry in entries])
+        self._rev = rev
+
+    archives = False
+    journaled = False
+    # SQLite checks and journals its own pages
+    damaged = frozenset()
+    archive_damaged = frozenset()
+
+    def flush(self):
+        pass
+
+    def repair_archive(self):
+        pass
+
+    def compact(self, records: list, days: Optional[dict] = None):
+        pass
+
+    def archive(self, entries: list):
+        pass
+
+    def archive_periods(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list:
+        return []
+
+    def iter_archive(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        return iter(())
+
+    def read_archive(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list:
+        return []
+
+    def find_archived(self, key: str) -> None:
+        return None
+
+    def archive_stats(self):
+        return {}
+
+    def query_range(self, start_date: str, end_date: str):
+        """Normalized objeto keys with any timestamp in the range, in insertion order."""
+        lo = start_date
+        hi = end_date + ' 23:59:59'
+        cur = self.conn.execute("""
+            SELECT key FROM (
+                SELECT seq, key FROM records WHERE subiu BETWEEN ?1 AND ?2
+                UNION
+                SELECT seq, key FROM records WHERE desceu BETWEEN ?1 AND ?2
+                UNION
+                SELECT seq, key FROM records WHERE pronto BETWEEN ?1 AND ?2
+            ) ORDER BY seq
+        """, (lo, hi))
+        return [row[0] for row in cur]
+
+
+_BACKENDS = {
+    'json': JsonBackend,
+    'sqlite': SqliteBackend,
+}
+
+
+class HistoryStore:
+    """Process-resident history: loaded once, indexed by normalized objeto.
+
+    The backend is read on first use; afterwards lookups and saves only touch
+    the in-memory index and persist the change through the backend. Writes
+    made by other processes are merged in before each save and by refresh().
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, backend: Optional[str] = None):
+        self.data_dir = data_dir
+        name = backend or config.get('storage_backend')
+        self.backend = _BACKENDS.get(name, JsonBackend)(data_dir)
+        self._records = None  # list of entries in insertion order
+        self.loaded = False
+        self.stats = HistoryStats()  # active and archived records
+        self._index = {}      # normalized objeto -> entry
+        self._search = None   # ObjetoIndex over active and archived entries, built on first search
+        self._search_pending = None  # entries added while the index is being built
+        self._search_build = threading.Lock()
+        self._recent = None   # sorted recency_key of the active entries, built on first use
+        self._archive_recent = {}  # period -> (partition list, its recency keys sorted, entries in that order)
+        # Held by writers for a whole save, file lock and compaction included
+        self._lock = threading.RLock()
+        # Held only while the in-memory records and indexes change, so readers
+        # on the GUI thread never wait for disk I/O behind _lock
+        self._view_lock = threading.Lock()
+        self._listeners = []
+
+    def _add(self, entry: Record):
+        with self._view_lock:
+            self._records.append(entry)
+            self._index[entry.key] = entry
+            self.stats.add(entry)
+            self._index_search(entry)
+            if self._recent is not None:
+                bisect.insort(self._recent, recency_key(entry))
+
+    def _index_search(self, entry: Record):
+        if self._search is not None:
+            self._search.add(entry)
+        elif self._search_pending is not None:
+            self._search_pending.append(entry)
+
+    def _merge(self, entry: Record):
+        """Insert entry or update the cached one in place; return the change, if any."""
+        current = self._index.get(entry.key)
+        if current is None:
+            self._add(entry)
+            return ('inserted', entry, ())
+        fields = tuple(f for f in Record.FIELDS if getattr(current, f) != getattr(entry, f))
+        if not fields:
+            return None
+        old = current.copy()
+        with self._view_lock:
+            for f in fields:
+                setattr(current, f, getattr(entry, f))
+            self.stats.replace(old, current)
+            if self._recent is not None and old.latest() != current.latest():
+                # Move the entry to its new place in the recency order
+                del self._recent[bisect.bisect_left(self._recent, recency_key(old))]
+                bisect.insort(self._recent, recency_key(current))
+            if 'status' in fields:
+                # Open/closed ranking of the type-ahead
+                self._index_search(current)
+        return ('updated', current, fields)
+
+    def _replay(self, event: dict):
+        objeto = event.get('objeto', '')
+        current = self._index.get(normalize(objeto))
+        entry = current.copy() if current is not None else _new_entry(objeto)
+        ts = to_epoch(event.get('ts'))
+        _apply_status(entry, event.get('status'), ts, keep_newer=True)
+        if ts is not None and event.get('status'):
+            # Logged only when its writer applied it: one change, wherever it landed
+            with self._view_lock:
+                self.stats.count(event['status'], ts)
+        return self._merge(entry)
+
+    def _sync_locked(self) -> list:
+        """Merge writes from other processes; caller holds both locks."""
+        reset, entries, events = self.backend.sync()
+        entries = list(entries)
+        if reset:
+            # Another process compacted: drop what it moved to the archive
+            keep = {e.key for e in entries}
+            keep.update(normalize(e.get('objeto', '')) for e in events)
+            self._drop([e for k, e in self._index.items() if k not in keep])
+            # Its snapshot carries the day counts up to the journal
+            days = self.backend.snapshot_days(_first_day())
+            with self._view_lock:
+                self.stats.by_day = days
+        changes = [self._merge(entry) for entry in entries]
+        changes += [self._replay(event) for event in events]
+        if self.backend.damaged:
+            changes += self._recover_locked()
+        if self.backend.archive_damaged:
+            self.backend.repair_archive()
+        return [c for c in changes if c is not None]
+
+    def _recover_locked(self) -> list:
+        """Rebuild from the last good snapshot plus the event log after a file
+        failed its checks, then write a clean snapshot; caller holds both locks.
+        """
+        entries, events = self.backend.recover()
+        changes = [self._merge(entry) for entry in entries]
+        changes += [self._replay(event) for event in events]
+        self._compact_locked()
+        # An older snapshot may hold entries archived since; count them once
+        stats = HistoryStats()
+        stats.merge(self.backend.archive_stats(), self.backend.count_days(_first_day()))
+        for entry in self._records:
+            stats.add(entry)
+        with self._view_lock:
+            self.stats = stats
+        return [c for c in changes if c is not None]
+
+    def load(self, progress=None):
+        """Read the backend and replay any journal on top of it (only once).
+
+        progress, if given, is called with each page of LOAD_PAGE entries as
+        the snapshot is read (before the journal is replayed on them).
+        """
+        if not self.loaded:
+            self._load(progress)
+
+    @diagnostics.timed('HistoryStore.load')
+    def _load(self, progress=None):
+        with self._lock:
+            if self.loaded:
+                return
+            self._records = []
+            self._index = {}
+            self._recent = None
+            self.stats = HistoryStats()
+            with self.backend.lock():
+                entries, events = self.backend.load()
+                self.stats.merge(self.backend.archive_stats())
+                self.backend.repair_archive()
+                page = []
+                for entry in entries:
+                    self._add(entry)
+                    if progress is not None:
+                        page.append(entry)
+                        if len(page) >= LOAD_PAGE:
+                            progress(page)
+                            page = []
+                if page:
+                    progress(page)
+                self.stats.merge({}, self.backend.snapshot_days(_first_day()))
+                if self.backend.damaged:
+                    # Never start from a damaged file (or save over it)
+                    self._recover_locked()
+                    events = []
+            for event in events:
+                self._replay(event)
+            self.loaded = True
+            if not self.backend.has_events():
+                # History saved before the event log existed
+                with self.backend.lock():
+                    self.backend.seed_events(self.backend.read_archive() + self._records)
+            if self.backend.archives and self._archivable():
+                # First start in a new month: move last month's closed records out
+                with self.backend.lock():
+                    self._compact_locked()
+
+    def _drop(self, entries: list):
+        if not entries:
+            return
+        gone = {id(e) for e in entries}
+        with self._view_lock:
+            self._records[:] = [e for e in self._records if id(e) not in gone]
+            for entry in entries:
+                self._index.pop(entry.key, None)
+            # Rebuilt on next use
+            self._recent = None
+
+    def _archivable(self) -> list:
+        """Records closed ("Pronto") before the current month."""
+        month = to_epoch(dt.date.today().replace(day=1).isoformat())
+        return [
+            e for e in self._records
+            if e.status == 'Pronto' and e.pronto is not None and e.pronto < month
+        ]
+
+    def _compact_locked(self):
+        """Archive closed records and rewrite the snapshot; caller holds both locks.
+
+        A later entry for an archived objeto starts a new active record.
+        """
+        if self.backend.archives:
+            archived = self._archivable()
+            if archived:
+                self.backend.archive(archived)
+                self._drop(archived)
+        with self._view_lock:
+            days = self.stats.recent(_first_day())
+        self.backend.compact(self._records, days)
+
+    def refresh(self) -> list:
+        """Apply writes made by other processes since the last load or save."""
+        if not self.loaded:
+            return []
+        with self._lock:
+            with self.backend.lock():
+                changes = self._sync_locked()
+        self._notify(changes)
+        return changes
+
+    def records(self) -> list:
+        """The cached active entries. Callers must treat them as read-only."""
+        self.load()
+        return self._records
+
+    def all_records(self) -> list:
+        """Archived entries followed by the active ones."""
+        return self.backend.read_archive() + self.records()
+
+    def get(self, objeto: str):
+        """The active entry of objeto (its archived cycles are not returned)."""
+        self.load()
+        return self._index.get(normalize(objeto))
+
+    def find(self, objeto: str) -> Optional[Record]:
+        """The active entry of objeto, else its newest archived cycle.
+
+        A store not loaded yet looks it up in the backend files instead of
+        loading the whole history (the status command of the CLI).
+        """
+        key = normalize(objeto)
+        entry = None
+        if self.loaded or not self.backend.journaled:
+            entry = self.get(objeto)
+        else:
+            try:
+                with self._lock:
+                    with self.backend.lock():
+                        row, events = self.backend.find(key)
+            except ValueError:
+                # A damaged line: the full load recovers it
+                entry = self.get(objeto)
+            else:
+                entry = Record.from_dict(row) if row is not None else None
+                for event in events:
+                    entry = entry or _new_entry(event.get('objeto', ''))
+                    _apply_status(entry, event.get('status'), to_epoch(event.get('ts')), keep_newer=True)
+        return entry if entry is not None else self.backend.find_archived(key)
+
+    def query_range(self, start_date: str, end_date: str) -> list:
+        """Entries with any timestamp between the two 'YYYY-MM-DD' dates.
+
+        Only the archive partitions overlapping the range are read.
+        """
+        self.load()
+        lo, hi = _day_bounds(start_date, end_date)
+        archived = [e for e in self.backend.read_archive(start_date, end_date) if e.in_range(lo, hi)]
+        with self._lock:
+            keys = self.backend.query_range(start_date, end_date)
+            if keys is None:
+                return archived + [e for e in self._records if e.in_range(lo, hi)]
+            return archived + [self._index[key] for key in keys if key in self._index]
+
+    def iter_range(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                   chunk: int = 1000):
+        """Yield lists of at most chunk entries (archived, then active), optionally
+        only those with a timestamp in the date range.
+
+        Nothing is copied whole: archives are read a partition at a time and
+        the active records a chunk at a time, so exports of any size run in
+        bounded memory.
+        """
+        self.load()
+        lo, hi = _day_bounds(start_date or '0001-01-01', end_date or '9999-12-31')
+        ranged = bool(start_date or end_date)
+        for part in self.backend.iter_archive(start_date, end_date):
+            for i in range(0, len(part), chunk):
+                rows = part[i:i + chunk]
+                yield [e for e in rows if e.in_range(lo, hi)] if ranged else rows
+        i = 0
+        while True:
+            with self._view_lock:
+                rows = self._records[i:i + chunk]
+            if not rows:
+                return
+            i += len(rows)
+            yield [e for e in rows if e.in_range(lo, hi)] if ranged else rows
+
+    def recency_index(self) -> list:
+        """recency_key of every active entry, sorted; built on first use and
+        then kept up to date by saves."""
+        self.load()
+        with self._view_lock:
+            return self._recency_locked()
+
+    def _recency_locked(self) -> list:
+        if self._recent is None:
+            self._recent = sorted(recency_key(e) for e in self._records)
+        return self._recent
+
+    def _archive_by_recency(self, period: str):
+        """(sorted recency keys, entries in that order) of an archive partition."""
+        part = self.backend.read_partition(period)
+        cached = self._archive_recent.get(period)
+        if cached is None or cached[0] is not part:
+            # Partitions are re-read (and re-sorted) only when their file changed
+            ordered = sorted(part, key=recency_key)
+            cached = self._archive_recent[period] = (part, [recency_key(e) for e in ordered], ordered)
+        return cached[1], cached[2]
+
+    def page_range(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                   after: Optional[tuple] = None, limit: int = LOAD_PAGE) -> list:
+        """Up to limit entries with a timestamp in the date range, most recent first.
+
+        Keyset pagination: after is the recency_key of the last entry of the
+        previous page (None for the first page), so each page costs the same
+        however deep into the range it is. Active entries come from a sorted
+        index; archive partitions are visited newest first and only until
+        they cannot hold entries more recent than the page already has.
+        """
+        lo, hi = _day_bounds(start_date or '0001-01-01', end_date or '9999-12-31')
+        ranged = bool(start_date or end_date)
+        # Entries whose latest change is before the range cannot be in it
+        stop = (-lo + 1, '') if ranged else None
+        self.load()
+        page = []
+        with self._view_lock:
+            # Taken under the lock: a compaction may replace the index
+            recent = self._recency_locked()
+            i = 0 if after is None else bisect.bisect_right(recent, after)
+            while i < len(recent) and len(page) < limit:
+                key = recent[i]
+                if stop is not None and key >= stop:
+                    break
+                entry = self._index[key[1]]
+                if not ranged or entry.in_range(lo, hi):
+                    page.append(entry)
+                i += 1
+        archived = []
+        for period, info in reversed(self.backend.archive_periods(start_date, end_date)):
+            if len(archived) >= limit:
+                # Nothing in this partition is newer than its last day
+                newest = (-(to_epoch(info['last']) + 86399), '')
+                if newest > recency_key(archived[limit - 1]):
+                    break
+            keys, entries = self._archive_by_recency(period)
+            taken = 0
+            for j in range(0 if after is None else bisect.bisect_right(keys, after), len(keys)):
+                if stop is not None and keys[j] >= stop:
+                    break
+                if not ranged or entries[j].in_range(lo, hi):
+                    archived.append(entries[j])
+                    taken += 1
+                    if taken >= limit:
+                        break
+            archived.sort(key=recency_key)
+        if not archived:
+            return page
+        return sorted(page + archived, key=recency_key)[:limit]
+
+    def timeline(self, objeto: str) -> list:
+        """Every status change saved for objeto, oldest first, as
+        {'objeto', 'status', 'ts'} dicts. Records keep only the latest
+        time of each status; this keeps them all.
+
+        Read through the offset index of the event log without waiting for
+        writers; the locks are only taken when the index needs catching up.
+        """
+        key = normalize(objeto)
+        events = self.backend.find_events(key)
+        if events is None:
+            with self._lock:
+                with self.backend.lock():
+                    events = self.backend.timeline(key)
+        # Imports may log a time older than changes already saved
+        return sorted(events, key=lambda event: event.get('ts') or '')
+
+    def summary(self) -> dict:
+        """Objects per current status, and status changes today and in the last 7 days.
+
+        Read from running counters; nothing is rescanned. Until the objeto
+        index is built, 'current' counts records, so an objeto reopened after
+        archiving also counts its archived cycle as Pronto.
+        """
+        self.load()
+        today = to_epoch(dt.date.today().isoformat()) // 86400
+        index = self._search
+        with self._view_lock:
+            return {
+                'current': index.current(STATUSES) if index is not None else self.stats.current(),
+                'today': self.stats.days(today, today),
+                'week': self.stats.days(today - 6, today),
+            }
+
+    def search_index(self) -> ObjetoIndex:
+        """The objeto index, built on first use and then kept up to date by saves.
+
+        The build runs without holding the store lock, so saves are not
+        blocked by it; entries added meanwhile are indexed at the end.
+        """
+        self.load()
+        with self._search_build:
+            if self._search is None:
+                with self._view_lock:
+                    records = list(self._records)
+                    self._search_pending = []
+                # Archived entries stay indexed after they leave the active records
+                index = ObjetoIndex(self.backend.read_archive() + records)
+                # complete() walks it too; built here so typing never does
+                self.recency_index()
+                with self._view_lock:
+                    for entry in self._search_pending:
+                        index.add(entry)
+                    self._search_pending = None
+                    self._search = index
+        return self._search
+
+    @diagnostics.timed('HistoryStore.complete')
+    def complete(self, text: str, limit: int = 10) -> list:
+        """Objeto keys starting with text, open and recently changed ones first.
+
+        Returns nothing while the index is not built yet (see search_index),
+        so typing never waits for it.
+        """
+        index = self._search
+        if index is None:
+            return []
+        with self._view_lock:
+            recent = (key for _, key in self._recency_locked())
+            return index.complete(text, limit, recent)
+
+    def search(self, text: str, after: Optional[str] = None, limit: Optional[int] = None) -> list:
+        """Entries, active or archived, whose objeto contains text (see ObjetoIndex).
+
+        Ordered by key; after (a key) and limit page the keys, and every
+        entry of a key comes in the same page.
+        """
+        index = self.search_index()
+        with self._view_lock:
+            return [e for key in index.search(text, after, limit) for e in index.entries(key)]
+
+    def subscribe(self, listener):
+        """Call listener(changes) after every write.
+
+        changes is a list of ('inserted', entry, ()) and
+        ('updated', entry, fields) tuples, where fields names the keys of the
+        entry that changed. Listeners run on the thread that saved.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def _notify(self, changes: list):
+        if not changes:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(changes)
+            except Exception:
+                pass
+
+    def save(self, objeto: str, status: str) -> dict:
+        return self.save_many([(objeto, status)])[0]
+
+    @diagnostics.timed('HistoryStore.save_many')
+    def save_many(self, batch) -> list:
+        """Apply (objeto, status) updates with one backend write.
+
+        An item may carry its own 'YYYY-MM-DD HH:MM:SS' time as a third
+        value (imports); otherwise the current time is used.
+        Returns the updated entry for each item of the batch.
+        """
+        batch = list(batch)
+        if not batch:
+            return []
+        with self._lock:
+            self.load()
+            with self.backend.lock():
+                # Start from the latest state on disk, not just our cache
+                changes = self._sync_locked()
+                ts = dt.datetime.now().strftime(TS_FORMAT)
+                secs = to_epoch(ts)
+
+                events = []
+                updated = {}  # normalized objeto -> updated copy of its entry
+                for objeto, status, *when in batch:
+                    key = normalize(objeto)
+                    entry = updated.get(key)
+                    if entry is None:
+                        current = self._index.get(key)
+                        entry = current.copy() if current is not None else _new_entry(objeto)
+                        updated[key] = entry
+                    item_ts = when[0] if when and when[0] else ts
+                    if item_ts is ts:
+                        applied = _apply_status(entry, status, secs)
+                    else:
+                        # Imported: never overwrite newer data with an older time
+                        applied = _apply_status(entry, status, to_epoch(item_ts), keep_newer=True)
+                    if applied:
+                        # Logged as stored: 'pronto' as 'Pronto'
+                        events.append({'objeto': objeto, 'status': _STATUS_FIELDS[status.lower()], 'ts': item_ts})
+
+                # Persist first so the cache never holds a change that is not on disk
+                self.backend.append(events, list(updated.values()))
+                with self._view_lock:
+                    for event in events:
+                        self.stats.count(event['status'], to_epoch(event['ts']))
+
+                for entry in updated.values():
+                    change = self._merge(entry)
+                    if change is not None:
+                        changes.append(change)
+
+                # Before compacting: imported entries may move to the archive
+                result = [self._index[normalize(item[0])] for item in batch]
+                if self.backend.pending >= COMPACT_EVERY:
+                    self._compact_locked()
+        self._notify(changes)
+        return result
+
+    @diagnostics.timed('HistoryStore.log_many')
+    def log_many(self, batch) -> int:
+        """Record (objeto, status) changes at the current time without
+        loading the history (the add command of the CLI).
+
+        They are appended to the journal under the file lock, and every
+        store, this one included, applies them on its next load or refresh;
+        the next save of a loaded store compacts if the journal grew long.
+        A loaded store, or a backend without a journal, saves them with
+        save_many() instead. Returns the number of changes recorded.
+        """
+        batch = [(objeto, status) for objeto, status in batch if (status or '').lower() in _STATUS_FIELDS]
+        if self.loaded or not self.backend.journaled:
+            self.save_many(batch)
+            return len(batch)
+        if not batch:
+            return 0
+        ts = dt.datetime.now().strftime(TS_FORMAT)
+        events = [{'objeto': objeto, 'status': _STATUS_FIELDS[status.lower()], 'ts': ts} for objeto, status in batch]
+        with self._lock:
+            with self.backend.lock():
+                self.backend.log(events)
+        return len(events)
+
+    def compact(self):
+        with self._lock:
+            self.load()
+            with self.backend.lock():
+                changes = self._sync_locked()
+                self._compact_locked()
+        self._notify(changes)
+
+    def flush(self):
+        """fsync appends still waiting for the group commit."""
+        self.backend.flush()
+
+
+def migrate_to_sqlite(data_dir: str = DATA_DIR) -> int:
+    """Copy historico.json (plus its journal) into historico.db.
+
+    Safe to run again: rows are upserted by normalized objeto.
+    Returns the number of records migrated.
+    """
+    json_store = HistoryStore(data_dir, backend='json')
+    entries = json_store.all_records()
+    db = SqliteBackend(data_dir, migrate=False)
+    db.import_entries(entries)
+    if not db.has_events():
+        db.import_events(iter_json_lines(json_store.backend.events_file))
+    return len(entries)
+
+
+_store = None
+
+
+def get_store() -> HistoryStore:
+    """The shared history store for this process."""
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+        atexit.register(_store.flush)
+    return _store
+
+
+def compact():
+    get_store().compact()
+
+
+@diagnostics.timed('load_history')
+def load_history(start_date: Optional[str] = None, end_date: Optional[str] = None):
+    """All records, or those with a timestamp between two 'YYYY-MM-DD' dates.
+
+    An objeto has one record per cycle: one for each time it was closed and
+    archived, plus the active one if it was reopened since, so it can appear
+    more than once (archived cycles first). With a range only the
+    overlapping archive partitions are opened. Errors reading the history
+    are raised, not returned as an empty list.
+    """
+    store = get_store()
+    if start_date or end_date:
+        entries = store.query_range(start_date or '0001-01-01', end_date or '9999-12-31')
+    else:
+        entries = store.all_records()
+    return [entry.to_dict() for entry in entries]
+
+
+def load_timeline(objeto: str) -> list:
+    """Every status change of objeto, oldest first ({'objeto', 'status', 'ts'})."""
+    try:
+        return get_store().timeline(objeto)
     except Exception:
         return []
 
 
+@diagnostics.timed('save_record')
 def save_record(objeto: str, status: str):
-    """Save or update a record. If objeto exists, update it; otherwise create new.
-    
+    """Save or update a record. If objeto has an active record, update it;
+    otherwise create new. A record closed ("Pronto") in an earlier month is
+    archived as it is, so a new status after that starts a new record (a new
+    cycle) instead of changing the archived one.
+
     Status can be: Subiu, Desceu, Pronto
     Each status sets its corresponding timestamp field.
+    The change is appended to the journal instead of rewriting the history.
     """
-    _ensure_storage()
-    ts = dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
     try:
-        data = load_history()
-        
-        # Find existing entry by objeto name (case-insensitive)
-        existing_idx = None
-        for i, entry in enumerate(data):
-            if entry.get('objeto', '').upper() == objeto.upper():
-                existing_idx = i
-                break
-        
-        if existing_idx is not None:
-            # Update existing entry
-            entry = data[existing_idx]
-        else:
-            # Create new entry
-            entry = {
-                'objeto': objeto,
-                'subiu': None,
-                'desceu': None,
-                'pronto': None,
-                'status': None,
-            }
-            data.append(entry)
-        
-        # Update the appropriate timestamp and status
-        status_lower = status.lower()
-        if status_lower == 'subiu':
-            entry['subiu'] = ts
-            entry['status'] = 'Subiu'
-        elif status_lower == 'desceu':
-            entry['desceu'] = ts
-            entry['status'] = 'Desceu'
-        elif status_lower == 'pronto':
-            entry['pronto'] = ts
-            entry['status'] = 'Pronto'
-        
-        with open(HIST_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return entry
+        return get_store().save(objeto, status).to_dict()
     except Exception:
         pass
     return None
 
 
+@diagnostics.timed('save_records')
+def save_records(batch):
+    """Save many (objeto, status) updates in one load/modify/write cycle.
+
+    Returns the updated entries, or an empty list if the batch failed.
+    """
+    try:
+        return [entry.to_dict() for entry in get_store().save_many(batch)]
+    except Exception:
+        pass
+    return []
+
+
 def show_history():
     # Delegated to Qt app
     try:
         from qt_app import TrayApp
         TrayApp.instance().show_history()
     except Exception:
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,258 @@
+import os
+import threading
+from typing import Optional
+
+from PySide6.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QObject, Signal,
+    QFileSystemWatcher, QTimer
+)
+import resources
+from history import get_store, recency_key
+
+# (header, record field) for each table column
+COLUMNS = [
+    ("Objeto", 'objeto'),
+    ("Subiu", 'subiu'),
+    ("Desceu", 'desceu'),
+    ("Pronto", 'pronto'),
+    ("Status", 'status'),
+]
+STATUS_COLUMN = 4
+# Raw cell values (epoch ints for the timestamps), so sorting skips formatting
+SORT_ROLE = Qt.UserRole
+_COLUMN_OF = {field: col for col, (_, field) in enumerate(COLUMNS)}
+
+
+class StoreNotifier(QObject):
+    """Relays HistoryStore change notifications to the GUI thread."""
+
+    changed = Signal(object)  # list of (kind, entry, fields) from HistoryStore
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        # Emitted from the saving thread; queued to receivers on the GUI thread
+        get_store().subscribe(self.changed.emit)
+
+
+_notifier = None
+
+
+def store_notifier() -> StoreNotifier:
+    """The shared notifier; must first be called from the GUI thread."""
+    global _notifier
+    if _notifier is None:
+        _notifier = StoreNotifier()
+    return _notifier
+
+
+class StoreLoader(QObject):
+    """Loads the history store on a background thread, a page at a time."""
+
+    page = Signal(object)  # list of entries, as read from the snapshot
+    done = Signal()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            # If another thread is already loading, this waits for it and no
+            # pages are delivered
+            get_store().load(progress=self.page.emit)
+        except Exception:
+            pass
+        self.done.emit()
+
+
+class HistoryWatcher(QObject):
+    """Picks up writes made to the history files by other OPECBrain processes.
+
+    Only the journal tail (or the changed SQLite rows) is read, by refresh
+    (usually SaveWorker.refresh, so the file lock and the read happen on the
+    writer thread); the resulting changes reach open views through the store
+    notifications.
+    """
+
+    DEBOUNCE_MS = 200
+
+    def __init__(self, refresh, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._store = get_store()
+        self._request_refresh = refresh
+        self._watcher = QFileSystemWatcher(self)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._refresh)
+        self._watcher.fileChanged.connect(lambda _: self._timer.start())
+        # The journal may not exist yet and the snapshot is replaced on compaction
+        self._watcher.directoryChanged.connect(lambda _: self._timer.start())
+        self._watch()
+
+    def _watch(self):
+        paths = [self._store.data_dir] + self._store.backend.watch_paths()
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        missing = [p for p in paths if p not in watched and os.path.exists(p)]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _refresh(self):
+        self._watch()
+        self._request_refresh()
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Table model over the history entries; cells are produced on demand.
+
+    Rows are either a fixed list (set_records) or fetched a page at a time
+    from a keyset-paginated source (set_pager) as the view scrolls.
+    """
+
+    # Rows fetched per fetchMore
+    FETCH_PAGE = 200
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._records = []
+        # id(entry) -> row; an objeto may have an archived row and an active one
+        self._row_of = {}
+        self._fetch = None   # fetch(after, limit) of the paged source, if any
+        self._cursor_of = recency_key
+        self._cursor = None  # cursor of the last row fetched
+        self._more = False
+        self._status_icons = {
+            'Subiu': resources.icon('subiu.png'),
+            'Desceu': resources.icon('desceu.png'),
+            'Pronto': resources.icon('check.png'),
+        }
+
+    def set_records(self, records: list):
+        self.beginResetModel()
+        # Shallow copy: new entries are added through apply_changes
+        self._records = list(records)
+        self._row_of = {id(e): row for row, e in enumerate(self._records)}
+        self._fetch = None
+        self._more = False
+        self.endResetModel()
+
+    def set_pager(self, fetch, cursor=recency_key):
+        """Show the entries fetch(after, limit) returns, most recent first
+        unless cursor says otherwise.
+
+        Only the first page is read now; canFetchMore/fetchMore read the
+        next ones, starting after cursor(last row), when the view scrolls
+        near the end.
+        """
+        self.beginResetModel()
+        self._records = []
+        self._row_of = {}
+        self._fetch = fetch
+        self._cursor_of = cursor
+        self._cursor = None
+        self._more = True
+        self._append(self._next_page())
+        self.endResetModel()
+
+    def _next_page(self) -> list:
+        page = self._fetch(self._cursor, self.FETCH_PAGE)
+        self._more = len(page) >= self.FETCH_PAGE
+        if page:
+            self._cursor = self._cursor_of(page[-1])
+        # Entries saved since the first page are already on top
+        return [e for e in page if not self.contains(e)]
+
+    def _append(self, records: list):
+        for row, entry in enumerate(records, len(self._records)):
+            self._records.append(entry)
+            self._row_of[id(entry)] = row
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._more:
+            return
+        page = self._next_page()
+        if not page:
+            return
+        first = len(self._records)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._append(page)
+        self.endInsertRows()
+
+    def append_records(self, records: list):
+        if not records:
+            return
+        first = len(self._records)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self._append(records)
+        self.endInsertRows()
+
+    def contains(self, entry: dict) -> bool:
+        row = self._row_of.get(id(entry))
+        return row is not None and self._records[row] is entry
+
+    def apply_changes(self, changes: list):
+        """Patch only the rows touched by a store write."""
+        new = []
+        for kind, entry, fields in changes:
+            row = self._row_of.get(id(entry))
+            if row is None or self._records[row] is not entry:
+                # New objeto, or a new cycle of an archived one
+                if self._fetch is not None:
+                    # Most recent first: goes on top (below, at the end of a fixed list)
+                    if not any(e is entry for e in new):
+                        new.append(entry)
+                    continue
+                row = len(self._records)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._records.append(entry)
+                self._row_of[id(entry)] = row
+                self.endInsertRows()
+            elif kind == 'updated':
+                cols = [_COLUMN_OF[f] for f in fields if f in _COLUMN_OF]
+                if cols:
+                    self.dataChanged.emit(self.index(row, min(cols)), self.index(row, max(cols)))
+        if new:
+            self.beginInsertRows(QModelIndex(), 0, len(new) - 1)
+            self._records[0:0] = new[::-1]
+            self._row_of = {id(e): row for row, e in enumerate(self._records)}
+            self.endInsertRows()
+
+    def record(self, row: int) -> dict:
+        return self._records[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._records[index.row()]
+        field = COLUMNS[index.column()][1]
+        if role == Qt.DisplayRole:
+            return entry.get(field) or ''
+        if role == SORT_ROLE:
+            value = getattr(entry, field)
+            if value is None:
+                return '' if field in ('objeto', 'status') else -1
+            return value
+        if role == Qt.DecorationRole and index.column() == STATUS_COLUMN:
+            return self._status_icons.get(entry.get('status'))
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return super().headerData(section, orientation, role)
+
+
+class HistoryFilterProxy(QSortFilterProxyModel):
+    """Sorts the history table; the model itself only holds the date range."""
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
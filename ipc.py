@@ -0,0 +1,175 @@
+"""Local HTTP endpoint of a running OPECBrain (127.0.0.1 only).
+
+    GET  /ping      -> {"app": "OPECBrain"}
+    POST /records   -> saves one or many records, answers {"saved": n}
+    POST /command   -> {"argv": [...]}: the arguments of main.py, run by the
+                       running app (save lines, --history, or the add bar)
+
+/records accepts JSON ({"objeto": ..., "status": ...}, a list of those, of
+[objeto, status] pairs or of "nome | status" strings, or {"records": [...]})
+or plain text with one "nome | status" line per record. Requests are served on their own threads
+and a whole request is saved with a single store write.
+
+The endpoint is off unless ipc_port is set in config.json. Web pages the
+user opens can also reach 127.0.0.1, so requests with an Origin header or
+a Host other than this machine are refused, and a POST must either be
+application/json (which browsers cannot send cross-site without a CORS
+preflight, never answered here) or carry the ipc_token of config.json in
+an X-OPECBrain-Token header.
+"""
+import hmac
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import config
+
+HOST = '127.0.0.1'
+APP_NAME = 'OPECBrain'
+TOKEN_HEADER = 'X-OPECBrain-Token'
+DEFAULT_STATUS = 'Subiu'
+# Largest request body accepted, in bytes
+MAX_BODY = 64 * 1024 * 1024
+
+
+def port() -> int:
+    """The configured port; 0 disables the endpoint."""
+    try:
+        return int(config.get('ipc_port') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_records(body: bytes, content_type: str = '') -> list:
+    """(objeto, status) pairs from a /records body; raises ValueError if invalid."""
+    from history import parse_line
+    from stats import STATUSES
+
+    text = body.decode('utf-8-sig')
+    if 'json' in content_type or text.lstrip()[:1] in ('{', '['):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get('records', [data])
+        if not isinstance(data, list):
+            raise ValueError('esperado um objeto ou uma lista de registros')
+        batch = []
+        for item in data:
+            if isinstance(item, dict):
+                objeto, status = item.get('objeto'), item.get('status') or DEFAULT_STATUS
+            elif isinstance(item, str):
+                objeto, status = parse_line(item, DEFAULT_STATUS)
+            elif isinstance(item, list) and 1 <= len(item) <= 2:
+                objeto, status = (item + [DEFAULT_STATUS])[:2]
+            else:
+                raise ValueError(f'registro inválido: {json.dumps(item, ensure_ascii=False)}')
+            batch.append((str(objeto or '').strip(), str(status or DEFAULT_STATUS)))
+    else:
+        batch = [parse_line(line, DEFAULT_STATUS) for line in text.splitlines() if line.strip()]
+    for objeto, status in batch:
+        if not objeto:
+            raise ValueError('objeto vazio')
+        if status.capitalize() not in STATUSES:
+            raise ValueError(f'status inválido: {status}')
+    return [(objeto.upper(), status.capitalize()) for objeto, status in batch]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = APP_NAME
+
+    def _reply(self, code: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY:
+            raise ValueError('corpo grande demais')
+        return self.rfile.read(length)
+
+    def _refused(self) -> bool:
+        """Answer 403 to requests that may come from a web page; True if refused."""
+        port = self.server.server_address[1]
+        host = self.headers.get('Host', '')
+        if self.headers.get('Origin') is not None or host not in (f'{HOST}:{port}', f'localhost:{port}'):
+            self._reply(403, {'error': 'forbidden'})
+            return True
+        return False
+
+    def _authorized(self) -> bool:
+        """JSON body, or the configured token for any other content type."""
+        if self.headers.get('Content-Type', '').split(';')[0].strip() == 'application/json':
+            return True
+        token = str(config.get('ipc_token') or '')
+        sent = self.headers.get(TOKEN_HEADER, '')
+        return bool(token) and hmac.compare_digest(sent.encode('utf-8'), token.encode('utf-8'))
+
+    def do_GET(self):
+        if self._refused():
+            return
+        if self.path == '/ping':
+            self._reply(200, {'app': APP_NAME})
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self._refused():
+            return
+        if not self._authorized():
+            self._reply(403, {'error': 'use application/json or the ipc_token header'})
+            return
+        try:
+            if self.path == '/records':
+                from history import get_store
+
+                batch = parse_records(self._body(), self.headers.get('Content-Type', ''))
+                get_store().save_many(batch)
+                self._reply(200, {'saved': len(batch)})
+            elif self.path == '/command':
+                data = json.loads(self._body() or b'{}')
+                argv = data.get('argv', []) if isinstance(data, dict) else None
+                if not isinstance(argv, list):
+                    raise ValueError('esperado {"argv": [...]}')
+                self.server.on_command([str(a) for a in argv])
+                self._reply(200, {'ok': True})
+            else:
+                self._reply(404, {'error': 'not found'})
+        except ValueError as e:
+            self._reply(400, {'error': str(e)})
+        except Exception as e:
+            self._reply(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class IpcServer:
+    """Serves the endpoint on a background thread."""
+
+    def __init__(self, on_command, port_number: int = None):
+        self.on_command = on_command
+        self.port = port() if port_number is None else port_number
+        self._httpd = None
+
+    def start(self) -> bool:
+        """False when disabled or the port is already taken."""
+        if not self.port:
+            return False
+        try:
+            self._httpd = ThreadingHTTPServer((HOST, self.port), _Handler)
+        except OSError:
+            return False
+        self._httpd.daemon_threads = True
+        self._httpd.on_command = self.on_command
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return True
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
@@ -1,12 +1,26 @@
+import timing  # first import: marks the process start
 import os
 import sys
-from qt_app import TrayApp
+
+import cli
 
 
 if __name__ == '__main__':
     ROOT = os.path.dirname(os.path.abspath(__file__))
     os.chdir(ROOT)
 
+    # Subcommands run headless: no QApplication, tray or keyboard hook
+    if len(sys.argv) > 1 and sys.argv[1] in cli.COMMANDS + ('-h', '--help'):
+        sys.exit(cli.main(sys.argv[1:]))
+
+    # Already running: hand the arguments to that instance instead of opening a second tray
+    import single_instance
+
+    if single_instance.send_command(sys.argv[1:]):
+        sys.exit(0)
+
+    from qt_app import TrayApp
+
     app = TrayApp.instance()
     try:
         app.run()
@@ -1,418 +1,30 @@
-import os
 import sys
 import threading
 import time
-from typing import Optional
 
-from PySide6.QtWidgets import (
-    QApplication, QSystemTrayIcon, QMenu, QDialog, QVBoxLayout,
-    QLabel, QLineEdit, QComboBox, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QWidget, QHeaderView, QPushButton, QDateEdit
-)
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QDialog
 from PySide6.QtGui import QIcon, QAction, QPixmap, QPainter, QColor
-from PySide6.QtCore import Qt, Signal, QObject, QDate
+from PySide6.QtCore import Qt, Signal, QObject, QTimer
 
-import keyboard
+import config
+import diagnostics
+import resources
+import timing
 
-from history import load_history, save_record
+# Dialogs, the history store and the keyboard hook are imported on first use
+# so the tray icon shows up as early as possible.
 
 
 class HotkeySignal(QObject):
-    triggered = Signal()
-
-
-class AddBarDialog(QDialog):
-    def __init__(self, parent: Optional[QWidget] = None):
-        super().__init__(parent)
-        self.setWindowTitle("Novo registro")
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setFixedWidth(620)
-
-        # Set window icon for taskbar
-        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'icons', 'brain.png')
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
-
-        # Main container with rounded corners
-        container = QWidget(self)
-        container.setObjectName("container")
-        container_lay = QVBoxLayout(self)
-        container_lay.setContentsMargins(0, 0, 0, 0)
-        container_lay.addWidget(container)
-
-        lay = QVBoxLayout(container)
-        lay.setContentsMargins(16, 16, 16, 16)
-        lay.setSpacing(12)
-
-        # Title row: input + status on same line
-        input_row = QHBoxLayout()
-        input_row.setSpacing(10)
-        self.input = QLineEdit()
-        self.input.setPlaceholderText("Título")
-        self.input.setMinimumHeight(36)
-        # Force uppercase
-        self.input.textChanged.connect(self._force_upper)
-        # Add key-return icon inside the input on the right
-        key_icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'icons', 'key-return.png')
-        if os.path.exists(key_icon_path):
-            self.enter_action = self.input.addAction(QIcon(key_icon_path), QLineEdit.TrailingPosition)
-        input_row.addWidget(self.input, 3)
-
-        self.status = QComboBox()
-        self.status.addItems(["Subiu", "Desceu", "Pronto"])
-        self.status.setMinimumHeight(36)
-        self.status.setMinimumWidth(130)
-        input_row.addWidget(self.status, 1)
-        lay.addLayout(input_row)
-
-        help_lbl = QLabel("Enter para salvar · Esc para fechar")
-        help_lbl.setAlignment(Qt.AlignCenter)
-        help_lbl.setObjectName("helpLabel")
-        lay.addWidget(help_lbl)
-
-        self.input.returnPressed.connect(self._on_enter)
-        self.input.setFocus()
-
-        # Install event filter to catch Esc key
-        self.input.installEventFilter(self)
-        self.status.installEventFilter(self)
-
-        # Modern grayscale dark stylesheet
-        self.setStyleSheet("""
-            #container {
-                background-color: #1a1a1a;
-                border-radius: 12px;
-                border: 1px solid #333333;
-            }
-            QLineEdit {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-                border: 1px solid #404040;
-                border-radius: 8px;
-                padding: 8px 12px;
-                font-size: 14px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #808080;
-            }
-            QComboBox {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-                border: 1px solid #404040;
-                border-radius: 8px;
-                padding: 8px 12px;
-                font-size: 14px;
-            }
-            QComboBox:focus {
-                border: 1px solid #808080;
-            }
-            QComboBox::drop-down {
-                border: none;
-                padding-right: 8px;
-            }
-            QComboBox::down-arrow {
-                image: url(common/icons/caret-down.png);
-                width: 12px;
-                height: 12px;
-                margin-right: 8px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-                selection-background-color: #404040;
-                border-radius: 8px;
-            }
-            #helpLabel {
-                color: #808080;
-                font-size: 12px;
-            }
-        """)
-
-    def eventFilter(self, obj, event):
-        from PySide6.QtCore import QEvent
-        if event.type() == QEvent.KeyPress and event.key() == Qt.Key_Escape:
-            self.close()
-            return True
-        return super().eventFilter(obj, event)
-
-    def _force_upper(self, text):
-        if text != text.upper():
-            pos = self.input.cursorPosition()
-            self.input.blockSignals(True)
-            self.input.setText(text.upper())
-            self.input.setCursorPosition(pos)
-            self.input.blockSignals(False)
-
-    def _on_enter(self):
-        text = self.input.text().strip()
-        if not text:
-            return
-        status = self.status.currentText()
-        if '|' in text:
-            parts = [p.strip() for p in text.split('|', 1)]
-            if len(parts) == 2 and parts[1].lower() in ("subiu", "desceu", "pronto"):
-                status = parts[1].capitalize()
-                text = parts[0]
-        save_record(text, status)
-        # keep dialog open for continuous entry: clear field
-        self.input.clear()
-        self.input.setFocus()
-
-    def show_centered(self):
-        self.adjustSize()
-        screen = QApplication.primaryScreen().availableGeometry()
-        w = self.width()
-        h = self.height()
-        x = (screen.width() - w) // 2
-        y = (screen.height() - h) // 2
-        self.move(x, y)
-        self.show()
-
-
-class HistoryDialog(QDialog):
-    def __init__(self, parent: Optional[QWidget] = None):
-        super().__init__(parent)
-        self.setWindowTitle("Histórico")
-        self.setWindowFlag(Qt.WindowStaysOnTopHint, True)
-        self.resize(1100, 580)
-
-        # Set window icon for taskbar
-        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'icons', 'brain.png')
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
-
-        lay = QVBoxLayout()
-        self.setLayout(lay)
-
-        # Date filter row
-        filter_row = QHBoxLayout()
-        filter_row.setSpacing(10)
-        
-        filter_row.addWidget(QLabel("Data Inicial:"))
-        self.date_start = QDateEdit()
-        self.date_start.setCalendarPopup(True)
-        self.date_start.setDate(QDate.currentDate())
-        self.date_start.setDisplayFormat("dd/MM/yyyy")
-        self.date_start.setMinimumHeight(32)
-        filter_row.addWidget(self.date_start)
-        
-        filter_row.addWidget(QLabel("Data Final:"))
-        self.date_end = QDateEdit()
-        self.date_end.setCalendarPopup(True)
-        self.date_end.setDate(QDate.currentDate())
-        self.date_end.setDisplayFormat("dd/MM/yyyy")
-        self.date_end.setMinimumHeight(32)
-        filter_row.addWidget(self.date_end)
-        
-        self.btn_filter = QPushButton("Filtrar")
-        self.btn_filter.setMinimumHeight(32)
-        self.btn_filter.setMinimumWidth(80)
-        self.btn_filter.clicked.connect(self.load)
-        filter_row.addWidget(self.btn_filter)
-        
-        filter_row.addStretch()
-        lay.addLayout(filter_row)
-
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Objeto", "Subiu", "Desceu", "Pronto", "Status"])
-        # Set column widths - Objeto gets more space
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.Stretch)  # Objeto stretches
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Subiu
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Desceu
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Pronto
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # Status
-        self.table.setMinimumWidth(1000)
-        lay.addWidget(self.table)
-
-        # Grayscale dark theme with dark title bar
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #1a1a1a;
-            }
-            QLabel {
-                color: #e0e0e0;
-                font-size: 13px;
-            }
-            QDateEdit {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-                border: 1px solid #404040;
-                border-radius: 6px;
-                padding: 6px 10px;
-                padding-right: 25px;
-                font-size: 13px;
-            }
-            QDateEdit:focus {
-                border: 1px solid #808080;
-            }
-            QDateEdit::drop-down {
-                subcontrol-origin: padding;
-                subcontrol-position: center right;
-                width: 20px;
-                border: none;
-                background: transparent;
-            }
-            QDateEdit::down-arrow {
-                image: url(common/icons/caret-down.png);
-                width: 12px;
-                height: 12px;
-            }
-            QPushButton {
-                background-color: #404040;
-                color: #e0e0e0;
-                border: 1px solid #505050;
-                border-radius: 6px;
-                padding: 6px 16px;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-                border: 1px solid #606060;
-            }
-            QPushButton:pressed {
-                background-color: #353535;
-            }
-            QCalendarWidget {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-            }
-            QCalendarWidget QToolButton {
-                color: #e0e0e0;
-                background-color: #2a2a2a;
-                border: none;
-                padding: 4px;
-            }
-            QCalendarWidget QMenu {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-            }
-            QCalendarWidget QSpinBox {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-                border: 1px solid #404040;
-            }
-            QCalendarWidget QAbstractItemView:enabled {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-                selection-background-color: #404040;
-                selection-color: #ffffff;
-            }
-            QTableWidget {
-                background-color: #1a1a1a;
-                color: #e0e0e0;
-                border: 1px solid #333333;
-                border-radius: 8px;
-                gridline-color: #333333;
-            }
-            QTableWidget::item {
-                padding: 8px;
-            }
-            QTableWidget::item:selected {
-                background-color: #404040;
-            }
-            QHeaderView::section {
-                background-color: #2a2a2a;
-                color: #e0e0e0;
-                padding: 10px;
-                border: none;
-                border-bottom: 1px solid #333333;
-                font-weight: bold;
-            }
-            QScrollBar:vertical {
-                background-color: #1a1a1a;
-                width: 12px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:vertical {
-                background-color: #404040;
-                border-radius: 6px;
-                min-height: 30px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background-color: #505050;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-        
-        # Dark title bar on Windows
-        self._set_dark_title_bar()
-
-        self.load()
-
-    def _set_dark_title_bar(self):
-        try:
-            import ctypes
-            from ctypes import wintypes
-            hwnd = int(self.winId())
-            DWMWA_USE_IMMERSIVE_DARK_MODE = 20
-            ctypes.windll.dwmapi.DwmSetWindowAttribute(
-                hwnd,
-                DWMWA_USE_IMMERSIVE_DARK_MODE,
-                ctypes.byref(ctypes.c_int(1)),
-                ctypes.sizeof(ctypes.c_int)
-            )
-        except Exception:
-            pass
+    triggered = Signal(str)  # action name from the 'hotkeys' setting
+
+
+class StoreReadySignal(QObject):
+    ready = Signal()  # history store loaded by the background thread
 
-    def _entry_in_date_range(self, entry, start_date: str, end_date: str) -> bool:
-        """Check if any timestamp in the entry falls within the date range."""
-        for field in ['subiu', 'desceu', 'pronto']:
-            ts = entry.get(field)
-            if ts:
-                # Extract date part (YYYY-MM-DD) from timestamp
-                entry_date = ts.split(' ')[0]
-                if start_date <= entry_date <= end_date:
-                    return True
-        return False
-
-    def load(self):
-        data = load_history()
-        
-        # Get date range filter
-        start_date = self.date_start.date().toString("yyyy-MM-dd")
-        end_date = self.date_end.date().toString("yyyy-MM-dd")
-        
-        # Filter data by date range
-        filtered_data = [entry for entry in data if self._entry_in_date_range(entry, start_date, end_date)]
-        
-        self.table.setRowCount(len(filtered_data))
-        
-        # Load icons
-        icon_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'icons')
-        icon_subiu = QIcon(os.path.join(icon_dir, 'subiu.png'))
-        icon_desceu = QIcon(os.path.join(icon_dir, 'desceu.png'))
-        icon_check = QIcon(os.path.join(icon_dir, 'check.png'))
-        
-        for i, entry in enumerate(filtered_data):
-            self.table.setItem(i, 0, QTableWidgetItem(entry.get('objeto', '')))
-            
-            # Subiu column with icon
-            subiu_item = QTableWidgetItem(entry.get('subiu', '') or '')
-
-            self.table.setItem(i, 1, subiu_item)
-            # Desceu column with icon
-            desceu_item = QTableWidgetItem(entry.get('desceu', '') or '')
-            self.table.setItem(i, 2, desceu_item)
-            
-            # Pronto column with icon
-            pronto_item = QTableWidgetItem(entry.get('pronto', '') or '')
-            self.table.setItem(i, 3, pronto_item)
-            
-            # Status column with icon
-            status = entry.get('status', '')
-            status_item = QTableWidgetItem(status)
-            if status == 'Subiu':
-                status_item.setIcon(icon_subiu)
-            elif status == 'Desceu':
-                status_item.setIcon(icon_desceu)
-            elif status == 'Pronto':
-                status_item.setIcon(icon_check)
-            self.table.setItem(i, 4, status_item)
+
+class CommandSignal(QObject):
+    received = Signal(object)  # argv posted to the /command endpoint
 
 
 class TrayApp:
@@ -422,6 +34,8 @@ class TrayApp:
         self.app = QApplication.instance() or QApplication(sys.argv)
         # Keep app running when windows are closed (tray app)
         self.app.setQuitOnLastWindowClosed(False)
+        # App icon and stylesheet, shared by every window
+        resources.install(self.app)
         # Ensure system tray is available
         if not QSystemTrayIcon.isSystemTrayAvailable():
             raise RuntimeError("System tray not available on this system")
@@ -449,28 +63,64 @@ class TrayApp:
         self.menu = QMenu()
         self.act_hist = QAction("Histórico")
         self.act_new = QAction("Novo registro")
+        self.act_export = QAction("Exportar…")
+        self.act_import = QAction("Importar…")
         self.act_quit = QAction("Sair")
         self.act_hist.triggered.connect(self.show_history)
         self.act_new.triggered.connect(self.show_addbar)
+        self.act_export.triggered.connect(self.export_history)
+        self.act_import.triggered.connect(self.import_history)
         self.act_quit.triggered.connect(self.quit)
         self.menu.addAction(self.act_hist)
         self.menu.addAction(self.act_new)
         self.menu.addSeparator()
+        self.menu.addAction(self.act_export)
+        self.menu.addAction(self.act_import)
+        if diagnostics.enabled:
+            self.act_diag = QAction("Diagnóstico")
+            self.act_diag.triggered.connect(self.show_diagnostics)
+            self.menu.addAction(self.act_diag)
+        self.menu.addSeparator()
         self.menu.addAction(self.act_quit)
         self.tray.setContextMenu(self.menu)
 
+        timing.mark('tray')
+
+        self._addbar = None  # built once, then hidden and reused
         self._addbar_open = False
         self._open_dialogs = []  # keep strong refs to prevent GC auto-close
-
+        self.save_worker = None
+        self.history_watcher = None
+
+        # Global hotkey actions; the key combinations come from the config
+        self._hotkey_actions = {
+            'new_record': self.show_addbar,
+            'open_history': self.show_history,
+        }
         # Signal bridge for cross-thread hotkey
         self._hotkey_signal = HotkeySignal()
-        self._hotkey_signal.triggered.connect(self.show_addbar)
-
-        # Hotkey thread
-        self._running = True
+        self._hotkey_signal.triggered.connect(self._on_hotkey)
+        self._store_ready = StoreReadySignal()
+        self._store_ready.ready.connect(self._update_tooltip)
+        self._command_signal = CommandSignal()
+        self._command_signal.received.connect(self._on_command)
+        self.ipc_server = None
+        # Later launches of main.py hand their arguments here (see single_instance.py)
+        from single_instance import InstanceServer
+
+        self.instance_server = InstanceServer()
+        self.instance_server.command.connect(self._on_command)
+        self.instance_server.start()
+        self._hotkey_at = 0.0  # perf_counter of the last key press, for diagnostics
+
+        # Hotkey thread: registers the hooks, then sleeps until quit()
+        self._stop_hotkeys = threading.Event()
         self.hotkey_thread = threading.Thread(target=self._hotkey_loop, daemon=True)
         self.hotkey_thread.start()
 
+        # Everything else waits until the event loop is running
+        QTimer.singleShot(0, self._finish_startup)
+
     @classmethod
     def instance(cls):
         if not cls._instance:
@@ -479,55 +129,181 @@ class TrayApp:
 
     def _load_icon(self) -> QIcon:
         try:
-            icon_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'icons')
             for name in ('brain.png', 'note-pencil.png', 'clipboard-text.png'):
-                p = os.path.join(icon_dir, name)
-                if os.path.exists(p):
-                    return QIcon(p)
+                icon = resources.icon(name)
+                if not icon.isNull():
+                    return icon
         except Exception:
             pass
         return QIcon()  # default empty icon
 
+    def _finish_startup(self):
+        self._start_services()
+        # Build the add bar ahead of the first hotkey
+        self._get_addbar()
+        timing.mark('startup_done')
+
+    def _start_services(self):
+        from save_worker import SaveWorker
+        from history_model import HistoryWatcher
+
+        # Single writer thread for all saves from the add bar
+        if self.save_worker is None:
+            self.save_worker = SaveWorker()
+        # Merge saves made by other instances sharing the data folder
+        if self.history_watcher is None:
+            from history_model import store_notifier
+
+            self.history_watcher = HistoryWatcher(self.save_worker.refresh)
+            store_notifier().changed.connect(self._update_tooltip)
+            # Index objeto names off the GUI thread, ready for the Histórico search
+            threading.Thread(target=self._build_search_index, daemon=True).start()
+        # Local endpoint for scripts and scanners, only imported when enabled
+        if self.ipc_server is None and config.get('ipc_port'):
+            import ipc
+
+            self.ipc_server = ipc.IpcServer(on_command=self._command_signal.received.emit)
+            self.ipc_server.start()
+
+    def _build_search_index(self):
+        try:
+            from history import get_store
+            get_store().search_index()
+            # Sorted order the Histórico pages through
+            get_store().recency_index()
+        except Exception:
+            pass
+        else:
+            # Store loaded: show the counters without waiting for a save
+            self._store_ready.ready.emit()
+
+    def _update_tooltip(self, _changes=None):
+        from history import get_store
+        from stats import format_counts
+
+        try:
+            summary = get_store().summary()
+        except Exception:
+            return
+        self.tray.setToolTip(
+            "OPEC Brain\n"
+            f"Agora — {format_counts(summary['current'])}\n"
+            f"Hoje — {format_counts(summary['today'])}"
+        )
+
+    def _get_addbar(self):
+        # The hotkey can fire before _finish_startup ran
+        if self._addbar is None:
+            from dialogs import AddBarDialog
+
+            self._start_services()
+            self._addbar = AddBarDialog(save_worker=self.save_worker)
+            self._addbar.finished.connect(self._on_addbar_finished)
+        return self._addbar
+
     def _hotkey_loop(self):
         try:
-            keyboard.add_hotkey('ctrl+0', lambda: self._hotkey_signal.triggered.emit())
-            while self._running:
-                time.sleep(0.2)
+            import keyboard
+
+            hotkeys = dict(config.DEFAULTS['hotkeys'], **(config.get('hotkeys') or {}))
+            handles = []
+            for action, combo in hotkeys.items():
+                if combo and action in self._hotkey_actions:
+                    handles.append(keyboard.add_hotkey(
+                        combo, self._emit_hotkey, args=(action,)))
+            # keyboard calls back from its own listener thread; nothing to poll
+            self._stop_hotkeys.wait()
+            for handle in handles:
+                keyboard.remove_hotkey(handle)
         except Exception:
             pass
 
+    def _emit_hotkey(self, action: str):
+        # Runs on the keyboard listener thread
+        if diagnostics.enabled:
+            self._hotkey_at = time.perf_counter()
+        self._hotkey_signal.triggered.emit(action)
+
+    def _on_hotkey(self, action: str):
+        handler = self._hotkey_actions.get(action)
+        if handler is not None:
+            handler()
+            if diagnostics.enabled:
+                diagnostics.record(f'hotkey.{action}', (time.perf_counter() - self._hotkey_at) * 1000)
+
+    def show_diagnostics(self):
+        from PySide6.QtWidgets import QMessageBox
+
+        try:
+            path = diagnostics.export()
+            footer = f"\n\nExportado para {path}"
+        except Exception as e:
+            footer = f"\n\nFalha ao exportar: {e}"
+        QMessageBox.information(None, "Diagnóstico", diagnostics.format_summary() + footer)
+
     def show_addbar(self):
         if self._addbar_open:
             return
         self._addbar_open = True
-        dlg = AddBarDialog()
-        dlg.finished.connect(lambda _: self._on_dialog_finished(dlg, addbar=True))
-        self._open_dialogs.append(dlg)
-        dlg.show_centered()
+        self._get_addbar().show_centered()
+        if timing.mark('first_addbar'):
+            timing.report()
 
-    def _on_dialog_finished(self, dlg: QDialog, addbar: bool = False):
-        try:
-            if addbar:
-                self._addbar_open = False
-        finally:
-            # remove reference
-            if dlg in self._open_dialogs:
-                self._open_dialogs.remove(dlg)
+    def _on_addbar_finished(self, _):
+        self._addbar_open = False
+
+    def _on_dialog_finished(self, dlg: QDialog):
+        # remove reference
+        if dlg in self._open_dialogs:
+            self._open_dialogs.remove(dlg)
 
     def show_history(self):
+        from dialogs import HistoryDialog
+
         dlg = HistoryDialog()
         self._open_dialogs.append(dlg)
         dlg.finished.connect(lambda _: self._on_dialog_finished(dlg))
         dlg.show()
 
+    def _on_command(self, argv):
+        """Arguments of a second launch: "nome | status" lines to save, or a window to show."""
+        from history import parse_line
+
+        lines = [a for a in argv if not a.startswith('--')]
+        if lines:
+            self._start_services()
+            batch = [parse_line(line, 'Subiu') for line in lines]
+            self.save_worker.submit_many([(objeto.upper(), status) for objeto, status in batch])
+        elif '--history' in argv:
+            self.show_history()
+        else:
+            self.show_addbar()
+
+    def _notify(self, message: str):
+        self.tray.showMessage("OPEC Brain", message)
+
+    def export_history(self):
+        from dialogs import export_history
+
+        export_history(on_done=self._notify)
+
+    def import_history(self):
+        from dialogs import import_history
+
+        import_history(on_done=self._notify)
+
     def run(self):
         self.app.exec()
 
     def quit(self):
-        try:
-            self._running = False
-        except Exception:
-            pass
+        # Wakes the hotkey thread, which removes its hooks and exits
+        self._stop_hotkeys.set()
+        self.instance_server.stop()
+        if self.ipc_server is not None:
+            self.ipc_server.stop()
+        # Flush saves still queued for the writer
+        if self.save_worker is not None:
+            self.save_worker.stop()
         self.tray.hide()
         self.app.quit()
 
@@ -0,0 +1,248 @@
+"""Icons and stylesheets shared by every window, loaded once per process.
+
+Icons come from the compiled Qt resource module resources_rc when it was
+built (see how-to-compile.txt), otherwise from common/icons. Either way each
+file is decoded on first use and the same QIcon/QPixmap is handed out after
+that, so opening or refreshing a dialog does not touch the disk.
+"""
+import os
+
+from PySide6.QtGui import QIcon, QPixmap
+from PySide6.QtWidgets import QApplication
+
+try:
+    import resources_rc  # noqa: F401  (registers :/icons)
+    ICON_PREFIX = ':/icons/'
+except ImportError:
+    ICON_PREFIX = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'icons', '').replace(os.sep, '/')
+
+APP_ICON = 'brain.png'
+
+_icons = {}
+_pixmaps = {}
+_installed = False
+
+
+def path(name: str) -> str:
+    """Resource path (or file path) of an icon, usable in stylesheets too."""
+    return ICON_PREFIX + name
+
+
+def icon(name: str) -> QIcon:
+    """The shared QIcon for common/icons/<name>; a null icon if it is missing."""
+    cached = _icons.get(name)
+    if cached is None:
+        cached = _icons[name] = QIcon(pixmap(name))
+    return cached
+
+
+def pixmap(name: str) -> QPixmap:
+    cached = _pixmaps.get(name)
+    if cached is None:
+        cached = _pixmaps[name] = QPixmap(path(name))
+    return cached
+
+
+# Each section is scoped to one window by its objectName, so the whole sheet
+# can be set once on the QApplication without restyling other widgets
+# (message boxes, file dialogs).
+ADDBAR_STYLE = """
+#addBar #container {
+    background-color: #1a1a1a;
+    border-radius: 12px;
+    border: 1px solid #333333;
+}
+#addBar QLineEdit {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    border: 1px solid #404040;
+    border-radius: 8px;
+    padding: 8px 12px;
+    font-size: 14px;
+}
+#addBar QLineEdit:focus {
+    border: 1px solid #808080;
+}
+#addBar QComboBox {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    border: 1px solid #404040;
+    border-radius: 8px;
+    padding: 8px 12px;
+    font-size: 14px;
+}
+#addBar QComboBox:focus {
+    border: 1px solid #808080;
+}
+#addBar QComboBox::drop-down {
+    border: none;
+    padding-right: 8px;
+}
+#addBar QComboBox::down-arrow {
+    image: url({caret});
+    width: 12px;
+    height: 12px;
+    margin-right: 8px;
+}
+#addBar QComboBox QAbstractItemView {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    selection-background-color: #404040;
+    border-radius: 8px;
+}
+#addBar #helpLabel {
+    color: #808080;
+    font-size: 12px;
+}
+"""
+
+# The completer popup is a top-level window, not a child of the add bar
+COMPLETER_STYLE = """
+QListView#addBarCompletions {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    border: 1px solid #404040;
+    selection-background-color: #404040;
+    font-size: 14px;
+}
+"""
+
+HISTORY_STYLE = """
+QDialog#historyDialog {
+    background-color: #1a1a1a;
+}
+#historyDialog > QLabel {
+    color: #e0e0e0;
+    font-size: 13px;
+}
+#historyDialog > QDateEdit {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    border: 1px solid #404040;
+    border-radius: 6px;
+    padding: 6px 10px;
+    padding-right: 25px;
+    font-size: 13px;
+}
+#historyDialog > QDateEdit:focus {
+    border: 1px solid #808080;
+}
+#historyDialog > #summaryLabel {
+    color: #a0a0a0;
+    font-size: 12px;
+}
+#historyDialog > QLineEdit {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    border: 1px solid #404040;
+    border-radius: 6px;
+    padding: 6px 10px;
+    font-size: 13px;
+}
+#historyDialog > QLineEdit:focus {
+    border: 1px solid #808080;
+}
+#historyDialog > QDateEdit::drop-down {
+    subcontrol-origin: padding;
+    subcontrol-position: center right;
+    width: 20px;
+    border: none;
+    background: transparent;
+}
+#historyDialog > QDateEdit::down-arrow {
+    image: url({caret});
+    width: 12px;
+    height: 12px;
+}
+#historyDialog > QPushButton {
+    background-color: #404040;
+    color: #e0e0e0;
+    border: 1px solid #505050;
+    border-radius: 6px;
+    padding: 6px 16px;
+    font-size: 13px;
+}
+#historyDialog > QPushButton:hover {
+    background-color: #505050;
+    border: 1px solid #606060;
+}
+#historyDialog > QPushButton:pressed {
+    background-color: #353535;
+}
+#historyDialog QCalendarWidget {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+}
+#historyDialog QCalendarWidget QToolButton {
+    color: #e0e0e0;
+    background-color: #2a2a2a;
+    border: none;
+    padding: 4px;
+}
+#historyDialog QCalendarWidget QMenu {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+}
+#historyDialog QCalendarWidget QSpinBox {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    border: 1px solid #404040;
+}
+#historyDialog QCalendarWidget QAbstractItemView:enabled {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    selection-background-color: #404040;
+    selection-color: #ffffff;
+}
+#historyDialog > QTableView {
+    background-color: #1a1a1a;
+    color: #e0e0e0;
+    border: 1px solid #333333;
+    border-radius: 8px;
+    gridline-color: #333333;
+}
+#historyDialog > QTableView::item {
+    padding: 8px;
+}
+#historyDialog > QTableView::item:selected {
+    background-color: #404040;
+}
+#historyDialog > QTableView QHeaderView::section {
+    background-color: #2a2a2a;
+    color: #e0e0e0;
+    padding: 10px;
+    border: none;
+    border-bottom: 1px solid #333333;
+    font-weight: bold;
+}
+#historyDialog > QTableView QScrollBar:vertical {
+    background-color: #1a1a1a;
+    width: 12px;
+    border-radius: 6px;
+}
+#historyDialog > QTableView QScrollBar::handle:vertical {
+    background-color: #404040;
+    border-radius: 6px;
+    min-height: 30px;
+}
+#historyDialog > QTableView QScrollBar::handle:vertical:hover {
+    background-color: #505050;
+}
+#historyDialog > QTableView QScrollBar::add-line:vertical, #historyDialog > QTableView QScrollBar::sub-line:vertical {
+    height: 0px;
+}
+"""
+
+
+def install(app: QApplication = None):
+    """Set the app icon and the stylesheet on the application (only once)."""
+    global _installed
+    app = app or QApplication.instance()
+    if _installed or app is None:
+        return
+    _installed = True
+    app.setWindowIcon(icon(APP_ICON))
+    caret = path('caret-down.png')
+    app.setStyleSheet(''.join(
+        style.replace('{caret}', caret) for style in (ADDBAR_STYLE, COMPLETER_STYLE, HISTORY_STYLE)
+    ))
@@ -0,0 +1,88 @@
+import queue
+import threading
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from history import get_store
+
+# How long the writer waits for more entries before flushing a batch
+COALESCE_SECONDS = 0.05
+
+_STOP = object()
+
+
+class SaveWorker(QObject):
+    """Dedicated writer thread for history saves.
+
+    Entries submitted from the GUI are queued and written by the worker; an
+    entry arriving while another is pending is coalesced into the same flush.
+    The result of each flush is reported through the signals below, which are
+    delivered on the GUI thread.
+    """
+
+    saved = Signal(object)  # list of entries written by one flush
+    failed = Signal(str)    # error message of a failed flush
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, objeto: str, status: str):
+        self._queue.put([(objeto, status)])
+
+    def submit_many(self, batch):
+        """Queue (objeto, status) pairs to be written in the same flush."""
+        self._queue.put(list(batch))
+
+    def refresh(self):
+        """Queue a merge of writes made by other processes.
+
+        Queued as an empty batch, so it runs on the writer thread and is
+        folded into any save waiting with it (saves merge them first anyway).
+        """
+        self._queue.put([])
+
+    def stop(self, timeout: float = 5.0):
+        """Flush what is still queued and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _next_batch(self):
+        """Block for the first entry, then gather whatever follows it shortly."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = list(item)
+        while True:
+            try:
+                item = self._queue.get(timeout=COALESCE_SECONDS)
+            except queue.Empty:
+                return batch, False
+            if item is _STOP:
+                return batch, True
+            batch.extend(item)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if not batch:
+                if not stopping:
+                    self._refresh()
+                continue
+            try:
+                entries = get_store().save_many(batch)
+            except Exception as e:
+                self.failed.emit(str(e))
+            else:
+                self.saved.emit(entries)
+
+    def _refresh(self):
+        # Changes reach open views through the store notifications
+        try:
+            get_store().refresh()
+        except Exception:
+            pass
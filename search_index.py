@@ -0,0 +1,210 @@
+import bisect
+import heapq
+import itertools
+from collections import Counter
+
+
+class ObjetoIndex:
+    """Prefix and substring index over objeto names.
+
+    Names are indexed by their normalized key (uppercase, see
+    history.normalize). Prefix lookups bisect a sorted list of keys;
+    substring lookups intersect the posting sets of the query's trigrams and
+    only check the few candidates left, so no lookup walks every record.
+    Entries are added as they are saved; nothing is ever re-indexed.
+
+    Objects whose latest entry is not "Pronto" are also kept in a small
+    sorted list of open keys, which complete() ranks first, and objects are
+    counted by the status of their latest entry (see current()).
+    """
+
+    GRAM = 3
+    # Candidates ranked per group by complete(); a prefix matching more keys
+    # than this walks the caller's recency order instead (see complete())
+    COMPLETE_SCAN = 256
+    # A paged search sorts its candidates when the rarest trigram of the
+    # query has at most this many keys; above it, matches are dense enough
+    # that walking the sorted keys finds a page sooner
+    SEARCH_SORT = 4096
+
+    def __init__(self, entries=()):
+        self._entries = {}  # key -> entries with that key (archived cycles first)
+        self._keys = []     # sorted keys
+        self._grams = {}    # trigram -> set of keys containing it
+        self._open = []     # sorted keys whose latest entry is not closed
+        self._status = {}   # key -> status of its latest entry, as counted in _counts
+        self._counts = Counter()
+        # Bulk build: one sort at the end instead of an insort per key
+        for entry in entries:
+            key = entry.key
+            same = self._entries.get(key)
+            if same is None:
+                self._entries[key] = [entry]
+                self._index_grams(key)
+            else:
+                same.append(entry)
+        self._keys = sorted(self._entries)
+        self._open = sorted(k for k, same in self._entries.items() if self._is_open(same[-1]))
+        self._status = {k: same[-1].status for k, same in self._entries.items()}
+        self._counts = Counter(self._status.values())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, entry):
+        """Index a new entry, or re-rank one whose status changed."""
+        key = entry.key
+        entries = self._entries.get(key)
+        if entries is None:
+            self._entries[key] = [entry]
+            bisect.insort(self._keys, key)
+            self._index_grams(key)
+        elif not any(e is entry for e in entries):
+            entries.append(entry)
+        self._track_open(key)
+
+    @staticmethod
+    def _is_open(entry) -> bool:
+        return entry.status != 'Pronto'
+
+    def _track_open(self, key: str):
+        status = self._entries[key][-1].status
+        old = self._status.get(key)
+        if status != old:
+            self._status[key] = status
+            self._counts[old] -= 1
+            self._counts[status] += 1
+        is_open = self._is_open(self._entries[key][-1])
+        i = bisect.bisect_left(self._open, key)
+        listed = i < len(self._open) and self._open[i] == key
+        if is_open and not listed:
+            self._open.insert(i, key)
+        elif listed and not is_open:
+            del self._open[i]
+
+    def entries(self, key: str) -> list:
+        return self._entries.get(key, [])
+
+    def current(self, statuses) -> dict:
+        """Objects per status of their latest entry, for each of statuses.
+
+        An object reopened after archiving counts once, as its new status.
+        """
+        return {status: self._counts[status] for status in statuses}
+
+    def _index_grams(self, key: str):
+        grams = self._grams
+        for gram in self._grams_of(key):
+            keys = grams.get(gram)
+            if keys is None:
+                grams[gram] = {key}
+            else:
+                keys.add(key)
+
+    def _grams_of(self, key: str) -> set:
+        return {key[i:i + self.GRAM] for i in range(len(key) - self.GRAM + 1)}
+
+    @staticmethod
+    def _prefix_range(keys: list, q: str):
+        i = bisect.bisect_left(keys, q)
+        # Every key with the prefix sorts before q followed by the highest code point
+        return i, bisect.bisect_left(keys, q + '\U0010ffff', i)
+
+    def prefix(self, text: str, limit=None) -> list:
+        """Sorted keys starting with text."""
+        q = text.strip().upper()
+        if not q:
+            return []
+        i, j = self._prefix_range(self._keys, q)
+        if limit is not None:
+            j = min(j, i + limit)
+        return self._keys[i:j]
+
+    def _recency(self, key: str) -> int:
+        return self._entries[key][-1].latest() or 0
+
+    def complete(self, text: str, limit: int = 10, recent=None) -> list:
+        """Up to limit keys starting with text: open objects first, then the
+        most recently changed; within each group the newest come first.
+
+        A prefix matching up to COMPLETE_SCAN keys is ranked exactly. For a
+        wider one, recent (active keys, newest first) is walked until enough
+        matches are found; without it, only the first COMPLETE_SCAN keys of
+        the range in alphabetical order compete. Archived-only keys always
+        come from that alphabetical window.
+        """
+        q = text.strip().upper()
+        if not q:
+            return []
+        oi, oj = self._prefix_range(self._open, q)
+        ki, kj = self._prefix_range(self._keys, q)
+        scan = self.COMPLETE_SCAN
+        if recent is not None and (oj - oi > scan or kj - ki > scan):
+            return self._complete_recent(q, limit, recent, min(limit, oj - oi), ki)
+        result = heapq.nlargest(limit, self._open[oi:min(oj, oi + scan)], key=self._recency)
+        if len(result) < limit:
+            closed = [k for k in self._keys[ki:min(kj, ki + scan)]
+                      if not self._is_open(self._entries[k][-1])]
+            result += heapq.nlargest(limit - len(result), closed, key=self._recency)
+        return result
+
+    def _complete_recent(self, q: str, limit: int, recent, wanted: int, ki: int) -> list:
+        opened, closed = [], []
+        for key in recent:
+            if not key.startswith(q) or key not in self._entries:
+                continue
+            if self._is_open(self._entries[key][-1]):
+                opened.append(key)
+            elif len(closed) < limit:
+                closed.append(key)
+            if len(opened) >= wanted and len(opened) + len(closed) >= limit:
+                break
+        result = opened[:limit]
+        if len(result) < limit:
+            # Keys with no active entry left are only in the archive
+            seen = set(closed)
+            archived = [k for k in itertools.islice(self._keys, ki, ki + self.COMPLETE_SCAN)
+                        if k.startswith(q) and k not in seen and not self._is_open(self._entries[k][-1])]
+            result += heapq.nlargest(limit - len(result), closed + archived, key=self._recency)
+        return result
+
+    @classmethod
+    def matches(cls, key: str, text: str) -> bool:
+        """Whether search(text) would return key."""
+        q = text.strip().upper()
+        if len(q) < cls.GRAM:
+            return bool(q) and key.startswith(q)
+        return q in key
+
+    def search(self, text: str, after=None, limit=None) -> list:
+        """Sorted keys containing text; queries shorter than a trigram match by prefix.
+
+        after and limit page the result: at most limit keys sorting after
+        the key after, so a page costs about the same however many keys match.
+        """
+        q = text.strip().upper()
+        start = 0 if after is None else bisect.bisect_right(self._keys, after)
+        if len(q) < self.GRAM:
+            if not q:
+                return []
+            i, j = self._prefix_range(self._keys, q)
+            i = max(i, start)
+            return self._keys[i:j if limit is None else min(j, i + limit)]
+        postings = []
+        for gram in self._grams_of(q):
+            keys = self._grams.get(gram)
+            if not keys:
+                return []
+            postings.append(keys)
+        postings.sort(key=len)
+        if limit is not None and len(postings[0]) > self.SEARCH_SORT:
+            result = []
+            for key in itertools.islice(self._keys, start, None):
+                if q in key:
+                    result.append(key)
+                    if len(result) >= limit:
+                        break
+            return result
+        candidates = postings[0].intersection(*postings[1:])
+        result = sorted(key for key in candidates if q in key and (after is None or key > after))
+        return result if limit is None else result[:limit]
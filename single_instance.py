@@ -0,0 +1,86 @@
+"""One tray per user: later launches of main.py hand their arguments to it.
+
+The running app listens on a local socket (a named pipe on Windows) named
+after the user. A later launch connects, sends its argv as one JSON line
+and exits once the running instance answers "ok". Unlike the HTTP endpoint
+of ipc.py, which is off unless ipc_port is set, this is always on and
+only reachable by the same user.
+"""
+import json
+import getpass
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+# Milliseconds a later launch waits for the running instance
+TIMEOUT = 1000
+
+
+def server_name() -> str:
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = 'default'
+    return f'OPECBrain-{user}'
+
+
+def send_command(argv: list, timeout: int = TIMEOUT) -> bool:
+    """Hand argv to a running instance; False if none answered."""
+    socket = QLocalSocket()
+    socket.connectToServer(server_name())
+    if not socket.waitForConnected(timeout):
+        return False
+    try:
+        socket.write(json.dumps({'argv': list(argv)}).encode('utf-8') + b'\n')
+        socket.waitForBytesWritten(timeout)
+        while not socket.canReadLine():
+            if not socket.waitForReadyRead(timeout):
+                return False
+        return bytes(socket.readLine().data()).strip() == b'ok'
+    finally:
+        socket.abort()
+
+
+class InstanceServer(QObject):
+    """Listens for later launches and emits their argv on the GUI thread."""
+
+    command = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._on_connection)
+
+    def start(self) -> bool:
+        """False when the socket cannot be created."""
+        name = server_name()
+        if self._server.listen(name):
+            return True
+        # Left behind by an instance that crashed (none answered send_command)
+        QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def stop(self):
+        self._server.close()
+
+    def _on_connection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self._on_ready(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready(self, socket):
+        if not socket.canReadLine():
+            return
+        try:
+            data = json.loads(bytes(socket.readLine().data()).decode('utf-8'))
+        except ValueError:
+            data = None
+        argv = data.get('argv') if isinstance(data, dict) else None
+        if not isinstance(argv, list):
+            socket.write(b'error\n')
+            return
+        socket.write(b'ok\n')
+        socket.flush()
+        self.command.emit([str(a) for a in argv])
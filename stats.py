@@ -0,0 +1,63 @@
+from collections import Counter
+from typing import Optional
+
+STATUSES = ('Subiu', 'Desceu', 'Pronto')
+
+
+class HistoryStats:
+    """Counts kept up to date as records change, so summaries need no rescan.
+
+    by_status counts records by their current status; by_day counts the
+    status changes applied per day (day number = timestamp // 86400, see
+    history.to_epoch), one per event: an object going up, down and up again
+    counts three changes, and nothing is ever taken back.
+    """
+
+    # Days of by_day carried over in each snapshot (today and the 6 before)
+    KEEP_DAYS = 7
+
+    def __init__(self):
+        self.by_status = Counter()
+        self.by_day = {}  # day number -> Counter(status -> changes)
+
+    def add(self, entry, sign: int = 1):
+        if entry.status:
+            self.by_status[entry.status] += sign
+
+    def replace(self, old, new):
+        """Account for a record changing from old to new."""
+        self.add(old, -1)
+        self.add(new)
+
+    def count(self, status: str, ts: int):
+        """Count one applied status change at ts."""
+        day = self.by_day.get(ts // 86400)
+        if day is None:
+            day = self.by_day[ts // 86400] = Counter()
+        day[status] += 1
+
+    def merge(self, by_status: dict, by_day: Optional[dict] = None):
+        """Add counts aggregated elsewhere (e.g. the archive manifest)."""
+        self.by_status.update(by_status)
+        for day, counts in (by_day or {}).items():
+            self.by_day.setdefault(day, Counter()).update(counts)
+
+    def recent(self, first: int) -> dict:
+        """by_day from day first on, to carry over to the next load."""
+        return {day: Counter(counts) for day, counts in self.by_day.items() if day >= first}
+
+    def days(self, first: int, last: int) -> dict:
+        """Status changes from day first to day last, both included."""
+        total = Counter()
+        for day in range(first, last + 1):
+            counts = self.by_day.get(day)
+            if counts:
+                total.update(counts)
+        return {status: total[status] for status in STATUSES}
+
+    def current(self) -> dict:
+        return {status: self.by_status[status] for status in STATUSES}
+
+
+def format_counts(counts: dict) -> str:
+    return ' · '.join(f'{status}: {counts.get(status, 0)}' for status in STATUSES)
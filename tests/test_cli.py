@@ -0,0 +1,46 @@
+"""add and status work from the files without loading the whole history."""
+import pytest
+
+import cli
+import history
+from history import HistoryStore
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path), backend='json')
+    store.save_many([('ARQ 1', 'Pronto', '2025-01-10 10:00:00'), ('ARQ 2', 'Pronto', '2025-02-10 10:00:00')])
+    store.compact()
+    store.save_many([('ATIVO', 'Subiu', '2026-10-01 10:00:00')])
+    store.flush()
+    monkeypatch.setattr(history, '_store', None)
+    monkeypatch.setattr(history, 'HistoryStore', lambda: HistoryStore(str(tmp_path), backend='json'))
+    return str(tmp_path)
+
+
+def _status(capsys, objeto):
+    code = cli.main(['status', objeto])
+    return code, capsys.readouterr().out.split('\t')[:2]
+
+
+def test_add_appends_without_loading(data_dir, capsys):
+    assert cli.main(['add', 'Ativo | desceu', 'novo', 'ARQ 1']) == 0
+    assert capsys.readouterr().out.strip() == '3 registros salvos'
+    assert not history.get_store().loaded
+
+    store = HistoryStore(data_dir, backend='json')
+    assert store.get('ATIVO').status == 'Desceu'
+    assert store.get('NOVO').status == 'Subiu'
+    # A new cycle for the archived objeto
+    assert store.get('ARQ 1').status == 'Subiu'
+    assert store.summary()['today']['Subiu'] == 2
+
+
+def test_status_finds_active_journaled_and_archived(data_dir, capsys):
+    assert _status(capsys, 'ativo') == (0, ['ATIVO', 'Subiu'])
+    assert _status(capsys, 'ARQ 2') == (0, ['ARQ 2', 'Pronto'])
+    cli.main(['add', 'ARQ 2 | desceu'])
+    capsys.readouterr()
+    assert _status(capsys, 'ARQ 2') == (0, ['ARQ 2', 'Desceu'])
+    assert not history.get_store().loaded
+    assert cli.main(['status', 'NADA']) == 1
@@ -0,0 +1,47 @@
+"""Several processes sharing one data folder."""
+import os
+import subprocess
+import sys
+
+from history import HistoryStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WRITER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from history import HistoryStore
+store = HistoryStore(sys.argv[2], backend='json')
+name, count = sys.argv[3], int(sys.argv[4])
+for i in range(count):
+    store.save(f'{name}-{i}', 'Subiu')
+    if i % 10 == 0:
+        store.save(f'{name}-{i}', 'Pronto')
+    if i == count // 2:
+        store.compact()
+store.flush()
+"""
+
+
+def test_processes_saving_at_once_lose_nothing(tmp_path):
+    data_dir = str(tmp_path)
+    watcher = HistoryStore(data_dir, backend='json')
+    watcher.load()
+
+    writers = [
+        subprocess.Popen([sys.executable, '-c', _WRITER, ROOT, data_dir, f'P{n}', '60'])
+        for n in range(4)
+    ]
+    for proc in writers:
+        assert proc.wait(timeout=120) == 0
+
+    store = HistoryStore(data_dir, backend='json')
+    records = {r.objeto: r.status for r in store.records()}
+    assert len(records) == 240
+    assert sum(status == 'Pronto' for status in records.values()) == 24
+    assert not store.backend.damaged
+    assert [e['status'] for e in store.timeline('P3-10')] == ['Subiu', 'Pronto']
+
+    # A process that was open all along picks up the others' writes
+    watcher.refresh()
+    assert {r.objeto: r.status for r in watcher.records()} == records
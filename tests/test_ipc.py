@@ -0,0 +1,46 @@
+"""The local endpoint rejects malformed requests with 400."""
+import http.client
+import json
+import socket
+
+import pytest
+
+import ipc
+
+
+@pytest.fixture
+def server():
+    with socket.socket() as s:
+        s.bind((ipc.HOST, 0))
+        port = s.getsockname()[1]
+    commands = []
+    srv = ipc.IpcServer(on_command=commands.append, port_number=port)
+    assert srv.start()
+    yield port, commands
+    srv.stop()
+
+
+def _post(port, path, body):
+    conn = http.client.HTTPConnection(ipc.HOST, port, timeout=5)
+    conn.request('POST', path, body, {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@pytest.mark.parametrize('body', [b'[1]', b'{"argv": "--history"}', b'not json'])
+def test_malformed_command_is_rejected(server, body):
+    port, commands = server
+    assert _post(port, '/command', body)[0] == 400
+    assert commands == []
+
+
+def test_command_is_forwarded(server):
+    port, commands = server
+    assert _post(port, '/command', b'{"argv": ["--history"]}') == (200, {'ok': True})
+    assert commands == [['--history']]
+
+
+@pytest.mark.parametrize('body', [b'{"records": 5}', b'[{"objeto": "A", "status": "Sumiu"}]', b'[[]]'])
+def test_malformed_records_are_rejected(body):
+    with pytest.raises(ValueError):
+        ipc.parse_records(body, 'application/json')
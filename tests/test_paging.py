@@ -0,0 +1,76 @@
+"""Keyset pages of the Histórico match a full sort of the same records."""
+import datetime as dt
+import random
+
+import pytest
+
+import history
+from history import HistoryStore, recency_key
+from search_index import ObjetoIndex
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    """Active records plus monthly archive partitions, with random times."""
+    data_dir = str(tmp_path_factory.mktemp('paging'))
+    rng = random.Random(1)
+    base = dt.datetime(2024, 1, 1)
+    batch = []
+    for i in range(1500):
+        t = base + dt.timedelta(minutes=rng.randint(0, 500 * 24 * 60))
+        for status in rng.sample(['Subiu', 'Desceu', 'Pronto'], rng.randint(1, 3)):
+            t += dt.timedelta(hours=rng.randint(1, 100))
+            batch.append((f'OBJ{i % 1200}', status, t.strftime(history.TS_FORMAT)))
+    batch.sort(key=lambda item: item[2])
+    writer = HistoryStore(data_dir, backend='json')
+    writer.save_many(batch)
+    writer.compact()
+    store = HistoryStore(data_dir, backend='json')
+    store.load()
+    assert store.records() and store.backend.read_archive()
+    return store
+
+
+def _all_pages(fetch, cursor, limit):
+    result, after = [], None
+    while True:
+        page = fetch(after, limit)
+        result += page
+        if len(page) < limit:
+            return result
+        after = cursor(page[-1])
+
+
+@pytest.mark.parametrize('start, end', [
+    (None, None),
+    ('2024-03-01', '2024-06-30'),
+    ('2025-01-01', '2025-12-31'),
+    ('2024-05-05', '2024-05-05'),
+    ('2020-01-01', '2020-02-01'),
+])
+@pytest.mark.parametrize('limit', [1, 7, 200])
+def test_page_range_matches_sorted_query(store, start, end, limit):
+    expected = store.query_range(start, end) if start else store.all_records()
+    expected = [recency_key(e) for e in sorted(expected, key=recency_key)]
+    pages = _all_pages(lambda after, n: store.page_range(start, end, after, n), recency_key, limit)
+    assert [recency_key(e) for e in pages] == expected
+
+
+def test_page_range_follows_saves(store):
+    store.save('OBJ5', 'Desceu')
+    store.save('NEWONE', 'Subiu')
+    first = store.page_range(None, None, None, 2)
+    assert {e.objeto for e in first} == {'OBJ5', 'NEWONE'}
+    expected = [recency_key(e) for e in sorted(store.all_records(), key=recency_key)]
+    pages = _all_pages(lambda after, n: store.page_range(None, None, after, n), recency_key, 50)
+    assert [recency_key(e) for e in pages] == expected
+
+
+@pytest.mark.parametrize('text', ['O', 'OBJ', 'OBJ1', 'BJ11', '99', 'NOPE'])
+@pytest.mark.parametrize('sort_limit', [ObjetoIndex.SEARCH_SORT, 8])
+def test_search_pages_match_full_search(store, monkeypatch, text, sort_limit):
+    # A low SEARCH_SORT takes the walk over the sorted keys instead
+    monkeypatch.setattr(ObjetoIndex, 'SEARCH_SORT', sort_limit)
+    expected = [e.key for e in store.search(text)]
+    pages = _all_pages(lambda after, n: store.search(text, after, n), lambda e: e.key, 37)
+    assert [e.key for e in pages] == expected
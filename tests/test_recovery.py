@@ -0,0 +1,206 @@
+"""Damaged history files are detected, set aside and rebuilt from."""
+import glob
+import json
+import os
+
+import pytest
+
+from history import HistoryStore, from_epoch
+
+SNAPSHOT = 'historico-snapshot.jsonl'
+JOURNAL = 'historico.jsonl'
+
+
+def _state(data_dir):
+    store = HistoryStore(data_dir, backend='json')
+    store.load()
+    return sorted((r.objeto, r.status, r.subiu, r.desceu, r.pronto) for r in store.records()), store
+
+
+@pytest.fixture
+def history_dir(tmp_path):
+    """A history with a snapshot, its .prev and changes still in the journal.
+
+    Returns (folder, records as a fresh load sees them).
+    """
+    data_dir = str(tmp_path)
+    store = HistoryStore(data_dir, backend='json')
+    store.save_many([(f'O{i}', 'Subiu') for i in range(300)])
+    store.compact()
+    store.save_many([(f'O{i}', 'Desceu') for i in range(0, 300, 3)])
+    store.compact()
+    store.save_many([(f'O{i}', 'Pronto') for i in range(0, 300, 7)])
+    store.flush()
+    return data_dir, _state(data_dir)[0]
+
+
+def _corrupt_files(data_dir):
+    return sorted(os.path.basename(p) for p in glob.glob(os.path.join(data_dir, '*.corrupt-*')))
+
+
+def test_clean_load_has_nothing_to_recover(history_dir):
+    data_dir, expected = history_dir
+    records, store = _state(data_dir)
+    assert records == expected
+    assert not store.backend.damaged
+    assert _corrupt_files(data_dir) == []
+
+
+def _truncate(path):
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+
+def _flip_byte(path):
+    data = bytearray(open(path, 'rb').read())
+    i = data.index(b'"O5')
+    data[i + 2] = ord('9')
+    open(path, 'wb').write(bytes(data))
+
+
+def _append_garbage(path):
+    with open(path, 'a') as f:
+        f.write('garbage\n')
+
+
+def _empty(path):
+    open(path, 'w').close()
+
+
+@pytest.mark.parametrize('damage', [_truncate, _flip_byte, _append_garbage, _empty])
+def test_damaged_snapshot_is_rebuilt(history_dir, damage):
+    data_dir, expected = history_dir
+    damage(os.path.join(data_dir, SNAPSHOT))
+
+    records, store = _state(data_dir)
+    assert records == expected
+    # Counters rebuilt once, not added on top of the damaged load
+    assert store.summary()['current'] == {'Subiu': 172, 'Desceu': 85, 'Pronto': 43}
+    # Kept aside, never deleted
+    assert [name.split('.corrupt-')[0] for name in _corrupt_files(data_dir)] == [SNAPSHOT]
+    # The rewritten snapshot passes its checks
+    records, store = _state(data_dir)
+    assert records == expected
+    assert not store.backend.damaged
+
+
+def test_corrupt_journal_line_is_rebuilt_from_event_log(history_dir):
+    data_dir, expected = history_dir
+    path = os.path.join(data_dir, JOURNAL)
+    lines = open(path, 'rb').read().splitlines(True)
+    lines[3] = lines[3].replace(b'Pronto', b'Pranto')
+    open(path, 'wb').write(b''.join(lines))
+
+    records, _ = _state(data_dir)
+    assert records == expected
+    assert [name.split('.corrupt-')[0] for name in _corrupt_files(data_dir)] == [JOURNAL]
+
+
+def test_both_snapshots_damaged_replays_event_log(history_dir):
+    data_dir, expected = history_dir
+    for name in (SNAPSHOT, SNAPSHOT + '.prev'):
+        open(os.path.join(data_dir, name), 'w').write('junk\n')
+    assert _state(data_dir)[0] == expected
+
+
+def test_crash_between_compaction_renames(history_dir):
+    data_dir, expected = history_dir
+    # The snapshot was moved to .prev and the new one never took its place
+    os.replace(os.path.join(data_dir, SNAPSHOT), os.path.join(data_dir, SNAPSHOT + '.prev'))
+    assert _state(data_dir)[0] == expected
+    assert _corrupt_files(data_dir) == []
+
+
+def test_truncated_legacy_array_is_not_taken_as_good(tmp_path):
+    data_dir = str(tmp_path)
+    rows = [{'objeto': f'L{i}', 'subiu': '2024-05-01 10:00:00', 'status': 'Subiu'} for i in range(100)]
+    text = json.dumps(rows, indent=2)
+    with open(os.path.join(data_dir, 'historico.json'), 'w', encoding='utf-8') as f:
+        f.write(text[:len(text) // 2])
+
+    records, _ = _state(data_dir)
+    # The records before the cut are kept; the conversion is set aside
+    assert 0 < len(records) < 100
+    assert [name.split('.corrupt-')[0] for name in _corrupt_files(data_dir)] == [SNAPSHOT]
+    assert os.path.exists(os.path.join(data_dir, 'historico.json.bak'))
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    """A history with two archived months. Returns (folder, archived records)."""
+    data_dir = str(tmp_path)
+    store = HistoryStore(data_dir, backend='json')
+    store.save_many([(f'A{i}', 'Pronto', f'2025-0{1 + i % 2}-1{i % 10} 10:00:00') for i in range(40)])
+    store.compact()
+    # Closed again later the same month: merged into the 2025-01 partition
+    store.save_many([(f'A{i}', 'Pronto', '2025-01-25 08:00:00') for i in range(0, 40, 4)])
+    store.compact()
+    return data_dir, _archived(data_dir)
+
+
+def _archived(data_dir):
+    store = HistoryStore(data_dir, backend='json')
+    store.load()
+    return sorted((r.objeto, r.pronto) for r in store.all_records())
+
+
+def test_archive_is_checksummed(archive_dir):
+    data_dir, expected = archive_dir
+    names = sorted(os.listdir(os.path.join(data_dir, 'archive')))
+    assert 'index.jsonl' in names and 'historico-2025-01.jsonl' in names
+    # Replaced copies are kept
+    assert 'index.jsonl.prev' in names and 'historico-2025-01.jsonl.prev' in names
+    assert len(expected) == 40
+
+
+@pytest.mark.parametrize('damage', [_truncate, _empty, _append_garbage])
+def test_damaged_manifest_is_rebuilt_from_partitions(archive_dir, damage):
+    data_dir, expected = archive_dir
+    index = os.path.join(data_dir, 'archive', 'index.jsonl')
+    damage(index)
+
+    store = HistoryStore(data_dir, backend='json')
+    store.load()
+    assert sorted((r.objeto, r.pronto) for r in store.all_records()) == expected
+    assert [period for period, _ in store.backend.archive_periods('2025-02-01', '2025-02-28')] == ['2025-02']
+    assert store.summary()['current'] == {'Subiu': 0, 'Desceu': 0, 'Pronto': 40}
+    # Written back, the damaged copy kept aside
+    assert not store.backend.archive_damaged
+    assert glob.glob(index + '.corrupt-*')
+    assert _archived(data_dir) == expected
+    # And saving keeps working
+    store.save('A1', 'Subiu')
+
+
+def test_truncated_legacy_manifest_is_rebuilt(archive_dir):
+    data_dir, expected = archive_dir
+    folder = os.path.join(data_dir, 'archive')
+    os.remove(os.path.join(folder, 'index.jsonl'))
+    with open(os.path.join(folder, 'index.json'), 'w') as f:
+        f.write('{"2025-01": {"file": "histor')
+
+    assert _archived(data_dir) == expected
+    assert os.path.exists(os.path.join(folder, 'index.jsonl'))
+
+
+def test_damaged_partition_falls_back_to_its_previous_copy(archive_dir):
+    data_dir, expected = archive_dir
+    part = os.path.join(data_dir, 'archive', 'historico-2025-01.jsonl')
+    data = open(part, 'rb').read().splitlines(keepends=True)
+    # Tear the line of A0
+    data = [line[:len(line) // 2] + b'\n' if b'"A0"' in line else line for line in data]
+    open(part, 'wb').write(b''.join(data))
+
+    store = HistoryStore(data_dir, backend='json')
+    store.load()
+    records = dict((r.objeto, r.pronto) for r in store.all_records())
+    # Every other line read as is; A0 from .prev, as closed before the last archiving
+    assert len(records) == 40
+    assert {k: v for k, v in records.items() if k != 'A0'} == {k: v for k, v in expected if k != 'A0'}
+    assert from_epoch(records['A0']) == '2025-01-10 10:00:00'
+    # Partitions are checked when read and written back by the next save
+    assert store.backend.archive_damaged == {part}
+    store.save('B1', 'Subiu')
+    assert not store.backend.archive_damaged
+    assert glob.glob(part + '.corrupt-*')
+    assert dict(_archived(data_dir))['A0'] == records['A0']
@@ -0,0 +1,38 @@
+"""Completion ranks open and recent objects first, however wide the prefix."""
+from history import HistoryStore
+from search_index import ObjetoIndex
+
+
+def _store(tmp_path, batch):
+    store = HistoryStore(str(tmp_path), backend='json')
+    for i in range(0, len(batch), 1000):
+        store.save_many(batch[i:i + 1000])
+    store.search_index()
+    return store
+
+
+def test_wide_prefix_finds_the_newest(tmp_path):
+    # Oldest first, so the newest sort last alphabetically as well
+    batch = [(f'CONTRATO {i:05d}', 'Subiu', f'2026-10-{1 + i // 500:02d} {i // 60 % 24:02d}:{i % 60:02d}:00')
+             for i in range(5000)]
+    store = _store(tmp_path, batch)
+    assert store.complete('CONTRATO 04', 3) == ['CONTRATO 04999', 'CONTRATO 04998', 'CONTRATO 04997']
+    assert store.complete('C', 1) == ['CONTRATO 04999']
+
+
+def test_open_objects_come_before_closed_ones(tmp_path):
+    batch = [(f'K{i:04d}', 'Subiu', f'2026-10-01 10:{i // 60 % 60:02d}:{i % 60:02d}') for i in range(1000)]
+    batch += [(f'K{i:04d}', 'Pronto', '2026-10-02 10:00:00') for i in range(500, 1000)]
+    store = _store(tmp_path, batch)
+    assert len(store.search_index()._open) > ObjetoIndex.COMPLETE_SCAN
+    assert store.complete('K', 2) == ['K0499', 'K0498']
+    # Every open key with the prefix first, then the newest closed ones
+    result = store.complete('K049', 12)
+    assert result[:10] == [f'K{i:04d}' for i in range(499, 489, -1)]
+    assert set(result[10:]) < {f'K{i:04d}' for i in range(500, 1000)}
+
+
+def test_narrow_prefix_is_ranked_exactly(tmp_path):
+    batch = [(f'P{i:02d}', 'Subiu', f'2026-10-01 10:00:{59 - i:02d}') for i in range(50)]
+    store = _store(tmp_path, batch)
+    assert store.complete('P', 3) == ['P00', 'P01', 'P02']
@@ -0,0 +1,69 @@
+"""The summary counts every applied change once, and every objeto once."""
+import datetime as dt
+
+import pytest
+
+from history import HistoryStore
+
+TODAY = dt.date.today()
+YESTERDAY = TODAY - dt.timedelta(days=1)
+
+
+def _changes(store):
+    store.save_many([('X', 'Subiu', f'{YESTERDAY} 09:00:00')])
+    store.save_many([('X', 'Subiu', f'{TODAY} 00:00:01')])
+    store.save_many([('X', 'Desceu', f'{TODAY} 00:00:02')])
+    store.save_many([('X', 'Subiu', f'{TODAY} 00:00:03')])
+
+
+def _counts(summary):
+    return summary['today'], summary['week']
+
+
+EXPECTED = ({'Subiu': 2, 'Desceu': 1, 'Pronto': 0}, {'Subiu': 3, 'Desceu': 1, 'Pronto': 0})
+
+
+def test_every_change_is_counted(tmp_path):
+    store = HistoryStore(str(tmp_path), backend='json')
+    _changes(store)
+    assert _counts(store.summary()) == EXPECTED
+    assert store.summary()['current'] == {'Subiu': 1, 'Desceu': 0, 'Pronto': 0}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_counts_survive_a_reload(tmp_path, compact):
+    store = HistoryStore(str(tmp_path), backend='json')
+    _changes(store)
+    if compact:
+        store.compact()
+    store.flush()
+    assert _counts(HistoryStore(str(tmp_path), backend='json').summary()) == EXPECTED
+
+
+def test_changes_of_another_process_are_counted(tmp_path):
+    store = HistoryStore(str(tmp_path), backend='json')
+    store.load()
+    other = HistoryStore(str(tmp_path), backend='json')
+    _changes(other)
+    store.refresh()
+    assert _counts(store.summary()) == EXPECTED
+    # After it compacts, its snapshot carries the counts
+    other.save('Y', 'Pronto')
+    other.compact()
+    store.refresh()
+    today, week = _counts(store.summary())
+    assert today == {'Subiu': 2, 'Desceu': 1, 'Pronto': 1}
+    assert week == {'Subiu': 3, 'Desceu': 1, 'Pronto': 1}
+
+
+def test_objeto_reopened_after_archiving_counts_once(tmp_path):
+    store = HistoryStore(str(tmp_path), backend='json')
+    store.save_many([('X', 'Pronto', '2025-01-10 10:00:00'), ('Z', 'Pronto', '2025-01-11 10:00:00')])
+    store.compact()
+    store.save('X', 'Desceu')
+    store.search_index()
+    assert store.summary()['current'] == {'Subiu': 0, 'Desceu': 1, 'Pronto': 1}
+    # And from a fresh start
+    store = HistoryStore(str(tmp_path), backend='json')
+    store.search_index()
+    assert store.summary()['current'] == {'Subiu': 0, 'Desceu': 1, 'Pronto': 1}
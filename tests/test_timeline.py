@@ -0,0 +1,61 @@
+"""An objeto's timeline is read through the offset index of the event log."""
+import os
+
+from history import HistoryStore
+
+
+def _timeline(store, objeto):
+    return [(e['status'], e['ts']) for e in store.timeline(objeto)]
+
+
+def _store(tmp_path):
+    store = HistoryStore(str(tmp_path), backend='json')
+    store.save_many([(f'T{i}', 'Subiu', f'2026-10-01 10:00:{i:02d}') for i in range(50)])
+    store.save_many([('T1', 'Desceu', '2026-10-02 10:00:00'), ('T11', 'Pronto', '2026-10-02 11:00:00')])
+    store.compact()
+    store.save_many([('T1', 'Subiu', '2026-10-03 10:00:00')])
+    return store
+
+
+EXPECTED = [('Subiu', '2026-10-01 10:00:01'), ('Desceu', '2026-10-02 10:00:00'), ('Subiu', '2026-10-03 10:00:00')]
+
+
+def test_index_is_kept_with_the_log(tmp_path):
+    store = _store(tmp_path)
+    # Found without catching up: every append indexed its lines
+    assert [(e['status'], e['ts']) for e in store.backend.find_events('T1')] == EXPECTED
+    assert _timeline(HistoryStore(str(tmp_path), backend='json'), 't1') == EXPECTED
+    # A key that ends another one is not mixed up with it
+    assert _timeline(store, 'T11') == [('Subiu', '2026-10-01 10:00:11'), ('Pronto', '2026-10-02 11:00:00')]
+
+
+def test_writes_of_another_process_are_indexed(tmp_path):
+    store = _store(tmp_path)
+    other = HistoryStore(str(tmp_path), backend='json')
+    other.save_many([('T1', 'Pronto', '2026-10-04 10:00:00')])
+    store.save_many([('T2', 'Desceu', '2026-10-04 11:00:00')])
+    assert _timeline(store, 'T1') == EXPECTED + [('Pronto', '2026-10-04 10:00:00')]
+    assert store.backend.find_events('T2') is not None
+
+
+def test_missing_or_damaged_index_is_rebuilt(tmp_path):
+    store = _store(tmp_path)
+    index = store.backend.events_index
+    os.remove(index)
+    assert store.backend.find_events('T1') is None
+    assert _timeline(HistoryStore(str(tmp_path), backend='json'), 'T1') == EXPECTED
+    size = os.path.getsize(index)
+
+    with open(index, 'ab') as f:
+        f.write(b'12')  # torn line, dropped by the next save
+    other = HistoryStore(str(tmp_path), backend='json')
+    assert _timeline(other, 'T1') == EXPECTED
+    other.save_many([('T3', 'Desceu', '2026-10-04 10:00:00')])
+    assert [e['status'] for e in other.backend.find_events('T3')] == ['Subiu', 'Desceu']
+    size = os.path.getsize(index)
+
+    # An index of another log
+    with open(index, 'wb') as f:
+        f.write(b'0 "T1"\n')
+    assert _timeline(HistoryStore(str(tmp_path), backend='json'), 'T1') == EXPECTED
+    assert os.path.getsize(index) == size
@@ -0,0 +1,51 @@
+"""Importing a file keeps the timestamps it holds and never invents one."""
+from history import HistoryStore, from_epoch
+from transfer import export_records, import_records
+
+
+def _import(tmp_path, text):
+    path = tmp_path / 'import.csv'
+    path.write_text(text, encoding='utf-8')
+    store = HistoryStore(str(tmp_path / 'data'), backend='json')
+    import_records(str(path), store=store)
+    return store
+
+
+def _times(entry):
+    return [from_epoch(t) if t else None for t in (entry.subiu, entry.desceu, entry.pronto)]
+
+
+def test_status_column_does_not_move_a_timestamp(tmp_path):
+    store = _import(tmp_path, 'Objeto;Subiu;Desceu;Pronto;Status\n'
+                              'C;2026-10-01 10:00:00;2026-10-02 10:00:00;;Subiu\n')
+    entry = store.get('C')
+    assert _times(entry) == ['2026-10-01 10:00:00', '2026-10-02 10:00:00', None]
+    assert entry.status == 'Desceu'
+
+
+def test_status_column_breaks_a_tie(tmp_path):
+    store = _import(tmp_path, 'Objeto;Subiu;Desceu;Pronto;Status\n'
+                              'T;2026-10-01 10:00:00;2026-10-01 10:00:00;;Subiu\n')
+    entry = store.get('T')
+    assert _times(entry) == ['2026-10-01 10:00:00', '2026-10-01 10:00:00', None]
+    assert entry.status == 'Subiu'
+
+
+def test_names_only_take_the_status_column(tmp_path):
+    store = _import(tmp_path, 'A;Pronto\nB;\n')
+    assert store.get('A').status == 'Pronto'
+    assert store.get('B').status == 'Subiu'
+
+
+def test_export_then_import_round_trips(tmp_path):
+    source = HistoryStore(str(tmp_path / 'source'), backend='json')
+    source.save_many([('X', 'Subiu', '2026-10-01 08:00:00'), ('X', 'Desceu', '2026-10-01 09:00:00'),
+                      ('Y', 'Pronto', '2026-10-02 08:00:00')])
+    path = str(tmp_path / 'export.csv')
+    export_records(path, store=source)
+
+    store = HistoryStore(str(tmp_path / 'data'), backend='json')
+    import_records(path, store=store)
+    for objeto in ('X', 'Y'):
+        assert _times(store.get(objeto)) == _times(source.get(objeto))
+        assert store.get(objeto).status == source.get(objeto).status
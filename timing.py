@@ -0,0 +1,39 @@
+import os
+import sys
+import json
+import time
+
+# Process start reference; main.py imports this module first
+T0 = time.perf_counter()
+
+REPORT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'common', 'data', 'startup_timing.json')
+
+# Enabled with `python main.py --timing`
+enabled = '--timing' in sys.argv
+
+_marks = {}
+
+
+def mark(name: str) -> bool:
+    """Record the first time name happened, in ms since process start.
+
+    Returns True if this call recorded it.
+    """
+    if name in _marks:
+        return False
+    _marks[name] = round((time.perf_counter() - T0) * 1000, 1)
+    return True
+
+
+def report():
+    """Print the startup marks and save them to common/data/startup_timing.json."""
+    if not enabled:
+        return
+    for name, ms in _marks.items():
+        print(f'{name}: {ms} ms')
+    try:
+        os.makedirs(os.path.dirname(REPORT_FILE), exist_ok=True)
+        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(_marks, f, indent=2)
+    except Exception:
+        pass
@@ -0,0 +1,208 @@
+"""CSV/XLSX export and import of the history.
+
+Usage:
+    python transfer.py export historico.csv [--from 2024-01-01] [--to 2024-12-31]
+    python transfer.py import lista.xlsx [--status Subiu]
+
+Both directions stream: records are written and read a chunk at a time, so
+memory stays bounded whatever the size of the history. XLSX needs the
+optional openpyxl package; CSV uses ';' (what Excel expects in pt-BR) and
+a UTF-8 BOM.
+"""
+import os
+import re
+import csv
+import sys
+import argparse
+import datetime as dt
+
+import history
+
+HEADER = ['Objeto', 'Subiu', 'Desceu', 'Pronto', 'Status']
+_FIELDS = ['objeto', 'subiu', 'desceu', 'pronto', 'status']
+_STATUSES = {'subiu': 'Subiu', 'desceu': 'Desceu', 'pronto': 'Pronto'}
+
+# Rows handed to HistoryStore.save_many at a time when importing
+IMPORT_CHUNK = 5000
+
+# What export_records writes; taken as is
+_ISO_TS = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+_TS_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d',
+               '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y')
+
+
+def _is_xlsx(path: str) -> bool:
+    return path.lower().endswith('.xlsx')
+
+
+def _openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise RuntimeError("Para arquivos .xlsx instale o pacote openpyxl (pip install openpyxl).")
+    return openpyxl
+
+
+def _rows(store, start_date, end_date):
+    for chunk in store.iter_range(start_date, end_date):
+        for entry in chunk:
+            yield [entry.get(field) or '' for field in _FIELDS]
+
+
+def export_records(path: str, start_date=None, end_date=None, store=None) -> int:
+    """Write the records (optionally only a date range) to a .csv or .xlsx file.
+
+    Returns the number of records written.
+    """
+    store = store or history.get_store()
+    count = 0
+    if _is_xlsx(path):
+        # write_only workbooks stream rows to disk instead of building cells
+        wb = _openpyxl().Workbook(write_only=True)
+        ws = wb.create_sheet('Histórico')
+        ws.append(HEADER)
+        for row in _rows(store, start_date, end_date):
+            ws.append(row)
+            count += 1
+        wb.save(path)
+    else:
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(HEADER)
+            for row in _rows(store, start_date, end_date):
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+def _read_rows(path: str):
+    if _is_xlsx(path):
+        wb = _openpyxl().load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in wb.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            wb.close()
+        return
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t|')
+        except csv.Error:
+            dialect = 'excel'
+        yield from csv.reader(f, dialect)
+
+
+def _parse_ts(value):
+    """A cell as 'YYYY-MM-DD HH:MM:SS', or None when empty or not a date."""
+    if isinstance(value, dt.datetime):
+        return value.strftime(history.TS_FORMAT)
+    if isinstance(value, dt.date):
+        return value.strftime('%Y-%m-%d 00:00:00')
+    text = str(value or '').strip()
+    if not text:
+        return None
+    if _ISO_TS.match(text):
+        return text
+    for fmt in _TS_FORMATS:
+        try:
+            return dt.datetime.strptime(text, fmt).strftime(history.TS_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+def _columns(row: list):
+    """Map field -> column from a header row, or None when row is data."""
+    names = [str(cell or '').strip().lower() for cell in row]
+    if 'objeto' not in names:
+        return None
+    return {field: names.index(field) for field in _FIELDS if field in names}
+
+
+def _row_items(row: list, columns: dict, default_status: str) -> list:
+    """(objeto, status, ts) updates for one row, oldest first."""
+    def cell(field):
+        col = columns.get(field)
+        return row[col] if col is not None and col < len(row) else None
+
+    objeto = str(cell('objeto') or '').strip().upper()
+    if not objeto:
+        return []
+    status = _STATUSES.get(str(cell('status') or '').strip().lower())
+    items = []
+    for field, name in _STATUSES.items():
+        ts = _parse_ts(cell(field))
+        if ts:
+            items.append((objeto, name, ts))
+    if not items:
+        # A plain list of names: saved now with the given (or default) status
+        return [(objeto, status or default_status)]
+    # The timestamps decide the status; the status column only breaks a tie
+    # between equal times (never a time of its own)
+    items.sort(key=lambda item: (item[2], item[1] == status))
+    return items
+
+
+def import_records(path: str, default_status: str = 'Subiu', store=None) -> int:
+    """Save the rows of a .csv or .xlsx file; returns the number of rows imported.
+
+    A header row naming the columns (Objeto, Subiu, Desceu, Pronto, Status,
+    as written by export_records) is optional; without one the first column
+    is the objeto and the second its status. Timestamps in the file are
+    kept, but never replace a newer one already saved, and a row only
+    changes the status when it is the newest change of its objeto. A row
+    with timestamps takes its status from the newest of them; the Status
+    column is only used for rows without any.
+    """
+    store = store or history.get_store()
+    columns = None
+    batch, count = [], 0
+    for i, row in enumerate(_read_rows(path)):
+        if i == 0:
+            columns = _columns(row)
+            if columns is not None:
+                continue
+            columns = {'objeto': 0, 'status': 1}
+        items = _row_items(row, columns, default_status)
+        if not items:
+            continue
+        batch.extend(items)
+        count += 1
+        if len(batch) >= IMPORT_CHUNK:
+            store.save_many(batch)
+            batch = []
+    if batch:
+        store.save_many(batch)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    exp = sub.add_parser('export', help='grava o histórico em .csv ou .xlsx')
+    exp.add_argument('path')
+    exp.add_argument('--from', dest='start_date', help='AAAA-MM-DD')
+    exp.add_argument('--to', dest='end_date', help='AAAA-MM-DD')
+    imp = sub.add_parser('import', help='salva os registros de um .csv ou .xlsx')
+    imp.add_argument('path')
+    imp.add_argument('--status', default='Subiu', choices=list(_STATUSES.values()),
+                     help='status das linhas sem status nem datas')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'export':
+            count = export_records(args.path, args.start_date, args.end_date)
+            print(f"{count} registros exportados para {os.path.abspath(args.path)}")
+        else:
+            count = import_records(args.path, args.status)
+            print(f"{count} registros importados de {args.path}")
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())